@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+
+from utils.file_handler import read_sales_data
+from utils.data_processor import (
+    iter_transactions,
+    parse_transactions,
+    parse_transactions_table,
+    validate_and_filter,
+    build_sales_aggregates,
+    calculate_total_revenue,
+    region_wise_sales,
+    top_selling_products,
+    customer_analysis,
+    daily_sales_trend,
+    find_peak_sales_day,
+    low_performing_products,
+    generate_sales_report
+)
+from utils.api_handler import enrich_sales_data
+from utils.parallel_processor import process_sales_file_parallel
+from utils.data_generator import PRODUCTS, generate_sales_file
+from utils.transaction_table import TransactionTable
+
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data", "generated")
+RESULTS_FILE = os.path.join(BASE_DIR, "output", "benchmark_results.json")
+
+# Parser variants compared by --parsers; "table_via_dicts" is the
+# table path before parse_transactions_table built columns directly
+PARSERS = {
+    "parse_transactions": parse_transactions,
+    "table_via_dicts": lambda lines: TransactionTable.from_transactions(iter_transactions(lines)),
+    "parse_transactions_table": parse_transactions_table
+}
+
+
+def _timed(stages, name, func, *args, **kwargs):
+    """
+    Runs func, records its wall time under name and returns its result
+    Output printed by the pipeline functions is suppressed
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        stages[name] = time.perf_counter() - start
+
+    return result
+
+
+def _synthetic_product_mapping():
+    """
+    Product mapping matching half the generated ProductIDs, so the
+    enrichment stage exercises both hits and misses without the network
+    """
+    return {
+        int(product_id[1:]): {
+            "title": names[0],
+            "category": "synthetic",
+            "brand": "bench",
+            "rating": 4.5
+        }
+        for product_id, names, _ in PRODUCTS[::2]
+    }
+
+
+def benchmark_file(filename):
+    """
+    Times every stage of the main.py pipeline on one file
+    Returns: dict of stage name -> seconds
+    """
+    stages = {}
+
+    raw_lines = _timed(stages, "read_sales_data", read_sales_data, filename)
+    transactions = _timed(stages, "parse_transactions", parse_transactions, raw_lines)
+    valid, _, _ = _timed(stages, "validate_and_filter", validate_and_filter, transactions)
+
+    _timed(stages, "build_sales_aggregates", build_sales_aggregates, valid)
+    _timed(stages, "calculate_total_revenue", calculate_total_revenue, valid)
+    _timed(stages, "region_wise_sales", region_wise_sales, valid)
+    _timed(stages, "top_selling_products", top_selling_products, valid)
+    _timed(stages, "customer_analysis", customer_analysis, valid)
+    _timed(stages, "daily_sales_trend", daily_sales_trend, valid)
+    _timed(stages, "find_peak_sales_day", find_peak_sales_day, valid)
+    _timed(stages, "low_performing_products", low_performing_products, valid)
+
+    enriched = _timed(
+        stages, "enrich_sales_data",
+        enrich_sales_data, valid, _synthetic_product_mapping()
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _timed(
+            stages, "generate_sales_report",
+            generate_sales_report, valid, enriched,
+            output_file=os.path.join(tmp, "sales_report.txt")
+        )
+
+    stages["total"] = sum(stages.values())
+    return stages
+
+
+def benchmark_parsers(filename, repeat=1):
+    """
+    Times each parser variant on the same raw lines
+    Returns: dict of parser name -> {seconds, rows_per_second}
+    """
+    raw_lines = read_sales_data(filename)
+    results = {}
+
+    for name, parser in PARSERS.items():
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parser(raw_lines)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+
+        results[name] = {
+            "seconds": best,
+            "rows_per_second": len(raw_lines) / best if best else None
+        }
+
+    return results
+
+
+def default_worker_counts():
+    """
+    Returns 1, 2, 4, ... up to the CPU count (which is always included)
+    """
+    cpus = os.cpu_count() or 1
+    counts = []
+    workers = 1
+    while workers < cpus:
+        counts.append(workers)
+        workers *= 2
+    counts.append(cpus)
+    return counts
+
+
+def benchmark_parallel(filename, worker_counts, repeat=1):
+    """
+    Times process_sales_file_parallel (parse, validate, aggregate and
+    count enrichment) on the same file at each worker count
+    Returns: dict of worker count -> {seconds, rows_per_second, speedup},
+    speedup being relative to the first worker count
+    """
+    mapping = _synthetic_product_mapping()
+    results = {}
+
+    for workers in worker_counts:
+        best = None
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                _, summary = process_sales_file_parallel(
+                    filename, workers=workers, product_mapping=mapping, stats={}
+                )
+                seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+
+        rows = summary.get("total_input", 0)
+        results[workers] = {
+            "seconds": best,
+            "rows_per_second": rows / best if best else None,
+            "speedup": results[worker_counts[0]]["seconds"] / best if results else 1.0
+        }
+
+    return results
+
+
+def _dataset(label, seed, data_dir):
+    """
+    Returns the synthetic file for a size, generating it if missing
+    """
+    rows = SIZES[label]
+    filename = os.path.join(data_dir, f"sales_{label}_seed{seed}.txt")
+
+    if not os.path.exists(filename):
+        print(f"Generating {rows:,} rows -> {filename}")
+        generate_sales_file(filename, rows, seed=seed)
+
+    return filename
+
+
+def run_benchmarks(sizes, seed=42, repeat=1, data_dir=DATA_DIR, parsers=False,
+                   parallel=None):
+    """
+    Generates (or reuses) a synthetic file per size and benchmarks it
+    The fastest of repeat runs is kept for each stage
+    With parsers=True, the parser variants are compared instead; with a
+    list of worker counts as parallel, the multi-process pipeline is
+    timed at each count.
+    """
+    runs = []
+
+    for label in sizes:
+        rows = SIZES[label]
+        filename = _dataset(label, seed, data_dir)
+        run = {"size": label, "rows": rows, "bytes": os.path.getsize(filename)}
+
+        if parallel:
+            run["parallel"] = benchmark_parallel(filename, parallel, repeat)
+
+            print(f"\n{label} ({rows:,} rows)")
+            for workers, result in run["parallel"].items():
+                print(f"  {workers:>3} workers{result['seconds']:>14.4f}s"
+                      f"{result['rows_per_second']:>14,.0f} rows/s"
+                      f"{result['speedup']:>8.2f}x")
+        elif parsers:
+            run["parsers"] = benchmark_parsers(filename, repeat)
+
+            print(f"\n{label} ({rows:,} rows)")
+            for name, result in run["parsers"].items():
+                print(f"  {name:<26}{result['seconds']:>10.4f}s"
+                      f"{result['rows_per_second']:>14,.0f} rows/s")
+        else:
+            best = {}
+            for _ in range(repeat):
+                for stage, seconds in benchmark_file(filename).items():
+                    best[stage] = min(seconds, best.get(stage, seconds))
+            run["stages"] = best
+
+            print(f"\n{label} ({rows:,} rows)")
+            for stage, seconds in best.items():
+                print(f"  {stage:<26}{seconds:>10.4f}s")
+
+        runs.append(run)
+
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sales analytics pipeline")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["10k"],
+                        help="dataset sizes to benchmark (default: 10k)")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per size; fastest is kept")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where generated files are kept")
+    parser.add_argument("--output", default=RESULTS_FILE, help="JSON results file")
+    parser.add_argument("--parsers", action="store_true",
+                        help="compare parser throughput instead of the full pipeline")
+    parser.add_argument("--parallel", nargs="*", type=int, metavar="WORKERS",
+                        help="time the multi-process pipeline at these worker counts "
+                             "(default: 1, 2, 4, ... up to the CPU count)")
+    args = parser.parse_args()
+
+    parallel = args.parallel
+    if parallel is not None and not parallel:
+        parallel = default_worker_counts()
+
+    runs = run_benchmarks(args.sizes, seed=args.seed, repeat=args.repeat,
+                          data_dir=args.data_dir, parsers=args.parsers,
+                          parallel=parallel)
+
+    results = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "runs": runs
+    }
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
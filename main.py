@@ -1,10 +1,24 @@
+import argparse
+import contextlib
+import glob
+import io
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 from utils.file_handler import read_sales_data
-from utils.data_processor import parse_transactions, validate_and_filter
+from utils.data_processor import (
+    parse_transactions,
+    validate_and_filter,
+    validate_and_filter_table
+)
+from utils.transaction_table import SymbolTable
+from utils.parse_cache import load_sales_table
+from utils.incremental import process_sales_incremental
+from utils.parallel_processor import process_sales_file_parallel
 
 # Task 2
 from utils.data_processor import (
+    get_sales_aggregates,
     calculate_total_revenue,
     region_wise_sales,
     top_selling_products,
@@ -18,55 +32,138 @@ from utils.data_processor import (
 from utils.api_handler import (
     fetch_all_products,
     create_product_mapping,
+    start_product_mapping,
     enrich_sales_data,
     save_enriched_data
 )
 
 # Task 4
-from utils.data_processor import generate_sales_report
+from utils.data_processor import (
+    generate_sales_report,
+    summarize_enrichment,
+    merge_sales_aggregates,
+    merge_enrichment_summaries
+)
 
+from utils.data_processor import (
+    set_analytics_backend,
+    set_distinct_customers,
+    analytics_settings,
+    apply_analytics_settings
+)
 
-def main():
-    try:
-        # Build file path safely
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(base_dir, "data", "sales_data.txt")
+from utils.instrumentation import PipelineInstrumentation
 
-        # Task 1.1: Read raw sales data
-        raw_lines = read_sales_data(file_path)
 
-        if not raw_lines:
-            print("No data read from file.")
-            return
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes")
 
-        print(f"Raw records read: {len(raw_lines)}")
 
-        # Task 1.2: Parse and clean data
-        transactions = parse_transactions(raw_lines)
-        print(f"Parsed transactions: {len(transactions)}")
+def _sales_data_path():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, "data", "sales_data.txt")
 
-        # Task 1.3: Validate and filter data & Task 5.1: User interaction for filters
-        choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
 
-        region = None
-        min_amount = None
-        max_amount = None
+def _ask_filters():
+    """
+    Task 5.1: asks for the optional region and amount filters
+    Returns: (region, min_amount, max_amount)
+    """
+    choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
 
-        if choice == "y":
-            region = input("Enter region (or press Enter to skip): ").strip() or None
+    region = None
+    min_amount = None
+    max_amount = None
 
-            min_amt = input("Enter minimum amount (or press Enter to skip): ").strip()
-            max_amt = input("Enter maximum amount (or press Enter to skip): ").strip()
+    if choice == "y":
+        region = input("Enter region (or press Enter to skip): ").strip() or None
 
-            min_amount = float(min_amt) if min_amt else None
-            max_amount = float(max_amt) if max_amt else None
+        min_amt = input("Enter minimum amount (or press Enter to skip): ").strip()
+        max_amt = input("Enter maximum amount (or press Enter to skip): ").strip()
 
-        valid_transactions, invalid_count, summary = validate_and_filter(
-            transactions,
-            region=region,        # you can change this to "North" for testing
-            min_amount=min_amount,    # e.g., 5000
-            max_amount=max_amount
-        )
+        min_amount = float(min_amt) if min_amt else None
+        max_amount = float(max_amt) if max_amt else None
+
+    return region, min_amount, max_amount
+
+
+def _print_analytics(aggregates):
+    print("Total Revenue:", calculate_total_revenue(aggregates))
+    print("Region-wise:", region_wise_sales(aggregates))
+    print("Top Products:", top_selling_products(aggregates))
+    print("Customers:", list(customer_analysis(aggregates).items())[:3])
+    print("Daily Trend:", list(daily_sales_trend(aggregates).items())[:3])
+    print("Peak Day:", find_peak_sales_day(aggregates))
+    print("Low Products:", low_performing_products(aggregates))
+
+
+def run_interactive(instrumentation, use_cache=False, report_formats=("text",),
+                    output_dir="output"):
+    """
+    Original interactive flow over data/sales_data.txt
+    The report is written to output_dir/sales_report.txt and the
+    enriched rows to data/enriched_sales_data.txt
+    With use_cache, parsed columns are reused from data/cache while the
+    file is unchanged, so repeat runs skip reading and parsing
+    The product catalog loads on a background thread from the start,
+    so network time overlaps ingest and analytics instead of adding
+    to them
+    """
+    stage = instrumentation.stage
+
+    try:
+        # Task 3.1 runs concurrently; enrichment joins on it below
+        mapping_future = start_product_mapping()
+
+        # Build file path safely
+        file_path = _sales_data_path()
+
+        if use_cache:
+            # Task 1.1 + 1.2 from the parsed-data cache (a TransactionTable)
+            with stage("load_sales_table") as st:
+                load_stats = {}
+                transactions = load_sales_table(file_path, stats=load_stats)
+                st["rows_out"] = len(transactions)
+                st.update(load_stats)
+
+            if not load_stats["raw_lines"]:
+                print("No data read from file.")
+                return
+
+            print(f"Raw records read: {load_stats['raw_lines']}")
+        else:
+            # Task 1.1: Read raw sales data
+            with stage("read_sales_data") as st:
+                read_stats = {}
+                raw_lines = read_sales_data(file_path, stats=read_stats)
+                st["rows_out"] = len(raw_lines)
+                st.update(read_stats)
+
+            if not raw_lines:
+                print("No data read from file.")
+                return
+
+            print(f"Raw records read: {len(raw_lines)}")
+
+            # Task 1.2: Parse and clean data
+            with stage("parse_transactions", rows_in=len(raw_lines)) as st:
+                # Shared symbol table: repeated Dates, IDs and Regions are stored once
+                transactions = parse_transactions(raw_lines, symbols=SymbolTable())
+                st["rows_out"] = len(transactions)
+        print(f"Parsed transactions: {len(transactions)}")
+
+        # Task 1.3: Validate and filter data & Task 5.1: User interaction for filters
+        region, min_amount, max_amount = _ask_filters()
+
+        validate = validate_and_filter_table if use_cache else validate_and_filter
+        with stage("validate_and_filter", rows_in=len(transactions)) as st:
+            valid_transactions, invalid_count, summary = validate(
+                transactions,
+                region=region,        # you can change this to "North" for testing
+                min_amount=min_amount,    # e.g., 5000
+                max_amount=max_amount
+            )
+            st["rows_out"] = len(valid_transactions)
 
         print("\nValidation & Filter Summary:")
         for key, value in summary.items():
@@ -74,34 +171,422 @@ def main():
 
         print("\nFinal valid transactions:", len(valid_transactions))
 
-        print("Total Revenue:", calculate_total_revenue(valid_transactions))
-        print("Region-wise:", region_wise_sales(valid_transactions))
-        print("Top Products:", top_selling_products(valid_transactions))
-        print("Customers:", list(customer_analysis(valid_transactions).items())[:3])
-        print("Daily Trend:", list(daily_sales_trend(valid_transactions).items())[:3])
-        print("Peak Day:", find_peak_sales_day(valid_transactions))
-        print("Low Products:", low_performing_products(valid_transactions))
+        # Single pass over the data; every analytic below reads from it
+        with stage("build_sales_aggregates", rows_in=len(valid_transactions)) as st:
+            aggregates = get_sales_aggregates(valid_transactions)
+
+        with stage("analytics"):
+            _print_analytics(aggregates)
 
         # -------- TASK 3 --------
-        api_products = fetch_all_products()
-        product_mapping = create_product_mapping(api_products)
+        # Only the time still spent waiting for the catalog is recorded
+        with stage("fetch_all_products") as st:
+            product_mapping = mapping_future.result()
+            st["rows_out"] = len(product_mapping)
 
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
-        save_enriched_data(enriched_transactions)
+        if use_cache:
+            # The aggregates came from the table's columns; enrichment and
+            # the enriched file need row dictionaries, decoded once here
+            valid_transactions = list(valid_transactions)
+
+        with stage("enrich_sales_data", rows_in=len(valid_transactions)) as st:
+            enriched_transactions = enrich_sales_data(
+                valid_transactions, product_mapping, in_place=True
+            )
+            st["rows_out"] = len(enriched_transactions)
+
+        with stage("save_enriched_data", rows_in=len(enriched_transactions)):
+            save_enriched_data(enriched_transactions)
 
 
         # -------- TASK 4 --------
-        generate_sales_report(
-        valid_transactions,
-        enriched_transactions
-    )
+        with stage("generate_sales_report"):
+            report_file = os.path.join(output_dir, "sales_report.txt")
+            generate_sales_report(
+            aggregates,
+            enriched_transactions,
+            output_file=report_file,
+            formats=report_formats
+        )
 
-        print("Sales report generated at output/sales_report.txt")
+        print(f"Sales report generated at {report_file}")
 
     except Exception as e:
         print("\n An unexpected error occurred:")
         print(e)
 
+
+def _enrichment_step(product_mapping):
+    """
+    Returns the enrich hook for process_sales_incremental, which
+    resolves product_mapping (a dict or a Future) on first use
+    """
+    def enrich(transactions):
+        if not transactions:
+            return summarize_enrichment([])
+        mapping = product_mapping
+        if not isinstance(mapping, dict):
+            mapping = mapping.result()
+        return summarize_enrichment(enrich_sales_data(transactions, mapping, in_place=True))
+
+    return enrich
+
+
+def run_incremental(instrumentation, report_formats=("text",), output_dir="output"):
+    """
+    Interactive flow that only reads the lines appended to
+    data/sales_data.txt since the last run and merges them into the
+    aggregates checkpointed in output_dir/sales_checkpoint.json
+    Changing the filters starts a new checkpoint. The enriched data
+    file is not rewritten, since earlier rows are no longer read; the
+    report's enrichment figures are carried in the checkpoint.
+    """
+    stage = instrumentation.stage
+
+    try:
+        mapping_future = start_product_mapping()
+        region, min_amount, max_amount = _ask_filters()
+
+        with stage("process_sales_incremental") as st:
+            stats = {}
+            aggregates, summary = process_sales_incremental(
+                _sales_data_path(),
+                os.path.join(output_dir, "sales_checkpoint.json"),
+                region=region,
+                min_amount=min_amount,
+                max_amount=max_amount,
+                enrich=_enrichment_step(mapping_future),
+                stats=stats
+            )
+            st["rows_in"] = stats.get("new_records")
+            st["rows_out"] = aggregates["transaction_count"]
+
+        print("\nValidation & Filter Summary:")
+        for key, value in summary.items():
+            print(f"{key}: {value}")
+
+        if not aggregates["transaction_count"]:
+            print("No valid transactions.")
+            return
+
+        with stage("analytics"):
+            _print_analytics(aggregates)
+
+        with stage("generate_sales_report"):
+            report_file = os.path.join(output_dir, "sales_report.txt")
+            generate_sales_report(aggregates, stats["enrichment"], output_file=report_file,
+                                  formats=report_formats)
+
+        print(f"Sales report generated at {report_file}")
+
+    except Exception as e:
+        print("\n An unexpected error occurred:")
+        print(e)
+
+
+# =========================
+#       BATCH MODE
+# =========================
+
+
+def process_sales_file(task, chunk_workers=1):
+    """
+    Worker: runs the full pipeline on one file and writes its reports
+    With incremental, only lines appended since the file's checkpoint
+    (in output_dir) are read and no enriched data file is written.
+    With chunk_workers > 1, the file is split into line-aligned byte
+    ranges parsed and aggregated in that many processes; enrichment is
+    then counted in the workers and no enriched data file is written.
+    Returns: dict with the file's aggregates, enrichment summary and log
+    """
+    (file_path, stem, region, min_amount, max_amount, product_mapping, output_dir,
+     use_cache, report_formats, incremental) = task
+    result = {"file": file_path, "aggregates": None, "enrichment": None, "error": None}
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            if incremental:
+                stats = {}
+                aggregates, summary = process_sales_incremental(
+                    file_path,
+                    os.path.join(output_dir, f"{stem}_checkpoint.json"),
+                    region=region,
+                    min_amount=min_amount,
+                    max_amount=max_amount,
+                    enrich=_enrichment_step(product_mapping),
+                    stats=stats,
+                    # Batch inputs are complete files: a last line without
+                    # a newline is a record, not a line still being written
+                    final=True
+                )
+                if not summary.get("total_input"):
+                    raise ValueError("No data read from file.")
+                print("Validation & Filter Summary:", summary)
+                enrichment = stats["enrichment"]
+
+            elif chunk_workers > 1:
+                stats = {}
+                aggregates, summary = process_sales_file_parallel(
+                    file_path,
+                    workers=chunk_workers,
+                    region=region,
+                    min_amount=min_amount,
+                    max_amount=max_amount,
+                    product_mapping=product_mapping,
+                    stats=stats
+                )
+                if not summary.get("total_input"):
+                    raise ValueError("No data read from file.")
+                print("Validation & Filter Summary:", summary)
+                enrichment = stats["enrichment"]
+
+            else:
+                if use_cache:
+                    load_stats = {}
+                    transactions = load_sales_table(file_path, stats=load_stats)
+                    if not load_stats["raw_lines"]:
+                        raise ValueError("No data read from file.")
+                    validate = validate_and_filter_table
+                else:
+                    raw_lines = read_sales_data(file_path)
+                    if not raw_lines:
+                        raise ValueError("No data read from file.")
+                    transactions = parse_transactions(raw_lines, symbols=SymbolTable())
+                    validate = validate_and_filter
+
+                valid_transactions, _, summary = validate(
+                    transactions,
+                    region=region,
+                    min_amount=min_amount,
+                    max_amount=max_amount
+                )
+                print("Validation & Filter Summary:", summary)
+
+                aggregates = get_sales_aggregates(valid_transactions)
+                if use_cache:
+                    # Rows are decoded once, for enrichment only
+                    valid_transactions = list(valid_transactions)
+                enriched_transactions = enrich_sales_data(
+                    valid_transactions, product_mapping, in_place=True
+                )
+                save_enriched_data(
+                    enriched_transactions,
+                    filename=os.path.join(output_dir, f"{stem}_enriched_sales_data.txt")
+                )
+
+                enrichment = summarize_enrichment(enriched_transactions)
+
+            report_file = os.path.join(output_dir, f"{stem}_sales_report.txt")
+            generate_sales_report(aggregates, enrichment, output_file=report_file,
+                                  formats=report_formats)
+            print(f"Sales report generated at {report_file}")
+
+            result["aggregates"] = aggregates
+            result["enrichment"] = enrichment
+
+        except Exception as e:
+            result["error"] = str(e) or type(e).__name__
+
+    result["log"] = log.getvalue()
+    return result
+
+
+# Output prefix of the merged report; no input may map to it
+MERGED_STEM = "merged"
+
+
+def output_stems(files):
+    """
+    Output name prefix for each input file: its path below the inputs'
+    common directory, without the extension and with separators
+    replaced by "_" (stores/north/sales.txt -> north_sales)
+    Raises ValueError if two inputs would share output files
+    """
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+    stems = [
+        os.path.splitext(os.path.relpath(os.path.abspath(path), base))[0].replace(os.sep, "_")
+        for path in files
+    ]
+
+    owners = {os.path.normcase(MERGED_STEM): "the merged report"}
+    for path, stem in zip(files, stems):
+        key = os.path.normcase(stem)
+        if key in owners:
+            raise ValueError(
+                f"{path} and {owners[key]} would write the same "
+                f"{stem}_* output files; rename one of them"
+            )
+        owners[key] = path
+
+    return stems
+
+
+def run_batch(args, instrumentation):
+    """
+    Processes every file matching the input globs in parallel and
+    writes per-file reports plus a merged report
+    """
+    stage = instrumentation.stage
+
+    files = sorted({
+        os.path.normpath(path) for pattern in args.inputs for path in glob.glob(pattern)
+    })
+    if not files:
+        print("No input files matched.")
+        return 1
+
+    try:
+        stems = output_stems(files)
+    except ValueError as e:
+        print("Error:", e)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    with stage("fetch_all_products") as st:
+        product_mapping = create_product_mapping(fetch_all_products())
+        st["rows_out"] = len(product_mapping)
+
+    tasks = [
+        (path, stem, args.region, args.min_amount, args.max_amount, product_mapping,
+         args.output_dir, args.cache, args.report_formats, args.incremental)
+        for path, stem in zip(files, stems)
+    ]
+
+    with stage("process_files", rows_in=len(files)) as st:
+        if len(tasks) == 1 and args.workers > 1 and not (args.cache or args.incremental):
+            # A single file is split into chunks across the workers instead
+            results = [process_sales_file(tasks[0], chunk_workers=args.workers)]
+        elif args.workers == 1 or len(tasks) == 1:
+            results = [process_sales_file(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=apply_analytics_settings,
+                initargs=analytics_settings()
+            ) as pool:
+                results = list(pool.map(process_sales_file, tasks))
+        st["rows_out"] = sum(1 for r in results if not r["error"])
+
+    merged = None
+    enrichment = {}
+    failures = 0
+
+    for result in results:
+        print(f"\n===== {result['file']} =====")
+        print(result["log"].rstrip())
+
+        if result["error"]:
+            failures += 1
+            print("Error:", result["error"])
+            continue
+
+        if merged is None:
+            merged = result["aggregates"]
+        else:
+            merge_sales_aggregates(merged, result["aggregates"])
+        merge_enrichment_summaries(enrichment, result["enrichment"])
+
+    if merged is not None and merged["transaction_count"]:
+        with stage("generate_merged_report"):
+            report_file = os.path.join(args.output_dir, f"{MERGED_STEM}_sales_report.txt")
+            generate_sales_report(merged, enrichment, output_file=report_file,
+                                  formats=args.report_formats, workers=args.workers)
+        print(f"\nMerged report generated at {report_file}")
+
+    print(f"\nProcessed {len(files) - failures} of {len(files)} files")
+    return 1 if failures else 0
+
+
+def _positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sales analytics. Runs interactively when no input files are given."
+    )
+    parser.add_argument("inputs", nargs="*",
+                        help="sales files or glob patterns (quote globs)")
+    parser.add_argument("--region", help="only keep transactions from this region")
+    parser.add_argument("--min-amount", type=float, help="minimum transaction amount")
+    parser.add_argument("--max-amount", type=float, help="maximum transaction amount")
+    parser.add_argument("--output-dir", default="output",
+                        help="directory for reports, checkpoints and timings; the "
+                             "interactive enriched data stays in data/ (default: output)")
+    parser.add_argument("--workers", type=_positive_int, default=os.cpu_count() or 1,
+                        help="number of files processed in parallel")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse parsed columns from data/cache while a file is unchanged")
+    parser.add_argument("--backend", choices=["python", "numpy"],
+                        help="analytics backend (default: python, or SALES_BACKEND)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only read lines appended since the last run (checkpointed)")
+    parser.add_argument("--approx-customers", action="store_true",
+                        help="count daily unique customers with HyperLogLog (~1.6%% error)")
+    parser.add_argument("--report-formats", nargs="+", default=["text"],
+                        choices=["text", "json", "csv"],
+                        help="report formats to write (default: text)")
+    parser.add_argument("--instrument", action="store_true",
+                        help="write a per-stage timing report")
+    parser.add_argument("--profile", action="store_true",
+                        help="capture a cProfile per stage (implies --instrument)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="record tracemalloc peaks per stage (implies --instrument)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Per-stage timing report, enabled with --instrument or SALES_INSTRUMENT=1
+    # (SALES_PROFILE=1 adds cProfile, SALES_TRACEMALLOC=1 adds tracemalloc)
+    profile = args.profile or _env_flag("SALES_PROFILE")
+    trace_memory = args.trace_memory or _env_flag("SALES_TRACEMALLOC")
+    instrumentation = PipelineInstrumentation(
+        enabled=args.instrument or profile or trace_memory or _env_flag("SALES_INSTRUMENT"),
+        profile=profile,
+        trace_memory=trace_memory,
+        profile_dir=os.path.join(args.output_dir, "profiles")
+    )
+
+    backend = args.backend or os.environ.get("SALES_BACKEND", "").strip().lower() or "python"
+    try:
+        set_analytics_backend(backend)
+    except (ValueError, ImportError) as e:
+        print("Error:", e)
+        return 1
+
+    if args.approx_customers or _env_flag("SALES_APPROX_CUSTOMERS"):
+        set_distinct_customers("approximate")
+
+    args.incremental = args.incremental or _env_flag("SALES_INCREMENTAL")
+
+    if args.inputs:
+        exit_code = run_batch(args, instrumentation)
+    elif args.incremental:
+        run_incremental(instrumentation, report_formats=args.report_formats,
+                        output_dir=args.output_dir)
+        exit_code = 0
+    else:
+        run_interactive(
+            instrumentation,
+            use_cache=args.cache or _env_flag("SALES_CACHE"),
+            report_formats=args.report_formats,
+            output_dir=args.output_dir
+        )
+        exit_code = 0
+
+    instrumentation.save(os.path.join(args.output_dir, "pipeline_timings.json"))
+    return exit_code
+
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
 
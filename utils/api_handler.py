@@ -1,62 +1,323 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.file_handler import write_text_atomic
+
+
+# =========================
+#       HTTP SESSION
+# =========================
+
+MAX_WORKERS = 8          # concurrent requests against the API
+PAGE_SIZE = 100          # products requested per catalog page
+MAX_RETRIES = 3          # retries per request on connection errors / 5xx
+BACKOFF_FACTOR = 0.5     # retry sleeps of 0.5s, 1s, 2s, ...
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns a shared requests.Session with a connection pool sized for
+    MAX_WORKERS and retries with exponential backoff
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"]
+            )
+            adapter = HTTPAdapter(
+                pool_connections=MAX_WORKERS,
+                pool_maxsize=MAX_WORKERS,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+
+    return _session
+
+
+def _clean_product(p):
+    return {
+        "id": p.get("id"),
+        "title": p.get("title"),
+        "category": p.get("category"),
+        "brand": p.get("brand"),
+        "price": p.get("price"),
+        "rating": p.get("rating")
+    }
+
 
 def fetch_product_info(product_id):
     """
-    Fetches dummy product data from API
+    Fetches a single product from the API by its numeric ID
     """
-    url = "https://dummyjson.com/products/1"
+    url = f"{BASE_URL}/{product_id}"
 
     try:
-        response = requests.get(url, timeout=5)
+        response = get_session().get(url, timeout=5)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException:
         return None
 
 
+def fetch_products_by_ids(product_ids, batch_size=100):
+    """
+    Fetches individual products concurrently, batch_size IDs at a time
+    Returns: dict of product ID -> cleaned product (None if not found)
+    """
+    results = {}
+    product_ids = list(dict.fromkeys(product_ids))
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for i in range(0, len(product_ids), batch_size):
+            batch = product_ids[i:i + batch_size]
+            for pid, product in zip(batch, pool.map(fetch_product_info, batch)):
+                results[pid] = _clean_product(product) if product else None
+
+    return results
+
+
+# =========================
+#     BACKGROUND OUTPUT
+# =========================
+
+# Catalog messages from a background thread are held in the thread's
+# buffer, so they do not interleave with the main thread's output and
+# input() prompts
+_output = threading.local()
+
+
+class _MessageBuffer:
+    """
+    Holds messages until flush(); messages written after that print
+    directly
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages = []
+
+    def write(self, args):
+        with self._lock:
+            if self._messages is not None:
+                self._messages.append(args)
+                return
+        print(*args)
+
+    def flush(self):
+        with self._lock:
+            messages, self._messages = self._messages or [], None
+        for args in messages:
+            print(*args)
+
+
+def _report(*args):
+    """
+    print() for the catalog functions, buffered on background threads
+    """
+    buffer = getattr(_output, "buffer", None)
+    if buffer is None:
+        print(*args)
+    else:
+        buffer.write(args)
+
+
+def _run_buffered(buffer, target, *args):
+    _output.buffer = buffer
+    return target(*args)
+
+
 # =========================
 #       TASK 3.1
 # =========================
 
 BASE_URL = "https://dummyjson.com/products"
 
+# On-disk product catalog cache
+CATALOG_CACHE_FILE = "data/product_catalog_cache.json"
+CATALOG_CACHE_TTL = 24 * 60 * 60        # seconds a cached catalog is fresh
+CATALOG_STALE_TTL = 7 * 24 * 60 * 60    # extra seconds it may be served while revalidating
+
 # ---------------- TASK 3.1 (a) ----------------
-def fetch_all_products():
+def _fetch_catalog_page(skip, etag=None):
+    """
+    Requests one page of the product catalog
+    Returns the requests.Response
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+
+    return get_session().get(
+        BASE_URL,
+        params={"limit": PAGE_SIZE, "skip": skip},
+        headers=headers,
+        timeout=10
+    )
+
+
+def _request_catalog(etag=None):
+    """
+    Requests the full product catalog, paging through it concurrently
+    The first page's ETag is used to revalidate against etag if given
+    Returns: (cleaned products or None if not modified, etag)
+    Raises requests.exceptions.RequestException on failure
+    """
+    response = _fetch_catalog_page(0, etag)
+
+    if response.status_code == 304:
+        _report("API NOT MODIFIED: Cached catalog is current")
+        return None, etag
+
+    response.raise_for_status()
+
+    data = response.json()
+    products = data.get("products", [])
+    total = data.get("total", len(products))
+
+    # Remaining pages are fetched in parallel over the pooled session,
+    # stepping by the page size the server actually returned (it may
+    # cap the requested limit)
+    skips = range(len(products), total, len(products)) if products else []
+
+    def fetch_page(skip):
+        page = _fetch_catalog_page(skip)
+        page.raise_for_status()
+        return page.json().get("products", [])
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for page_products in pool.map(fetch_page, skips):
+            products.extend(page_products)
+
+    if len(products) < total:
+        _report(f"API WARNING: Fetched {len(products)} of {total} products")
+
+    cleaned_products = [_clean_product(p) for p in products]
+
+    _report(f"API SUCCESS: Fetched {len(cleaned_products)} products")
+    return cleaned_products, response.headers.get("ETag")
+
+
+def fetch_all_products(use_cache=True, cache_file=CATALOG_CACHE_FILE,
+                       ttl=CATALOG_CACHE_TTL, stale_ttl=CATALOG_STALE_TTL):
     """
     Fetches all products from DummyJSON API
+    With use_cache, a fresh on-disk catalog is returned without any
+    network call, a stale one is returned while it is revalidated in
+    the background, and the cache is used as a fallback when offline
     Returns list of product dictionaries
     """
-    try:
-        response = requests.get(f"{BASE_URL}?limit=100", timeout=10)
-        response.raise_for_status()
+    if not use_cache:
+        try:
+            products, _ = _request_catalog()
+            return products
+        except requests.exceptions.RequestException as e:
+            _report("API FAILURE:", e)
+            return []
+
+    cache = load_catalog_cache(cache_file)
 
-        data = response.json()
-        products = data.get("products", [])
+    if cache is not None:
+        age = time.time() - cache["fetched_at"]
 
-        cleaned_products = []
-        for p in products:
-            cleaned_products.append({
-                "id": p.get("id"),
-                "title": p.get("title"),
-                "category": p.get("category"),
-                "brand": p.get("brand"),
-                "price": p.get("price"),
-                "rating": p.get("rating")
-            })
+        if age < ttl:
+            _report(f"CACHE HIT: Loaded {len(cache['products'])} products")
+            return cache["products"]
 
-        print(f"API SUCCESS: Fetched {len(cleaned_products)} products")
-        return cleaned_products
+        if age < ttl + stale_ttl:
+            _report(f"CACHE STALE: Loaded {len(cache['products'])} products, revalidating")
+            threading.Thread(
+                target=_run_buffered,
+                args=(getattr(_output, "buffer", None), _revalidate_catalog, cache, cache_file),
+                daemon=True
+            ).start()
+            return cache["products"]
+
+    return _revalidate_catalog(cache, cache_file)
+
+
+def _revalidate_catalog(cache, cache_file):
+    """
+    Refreshes the catalog cache from the API
+    Falls back to the cached products when the API is unreachable
+    """
+    etag = cache.get("etag") if cache else None
 
+    try:
+        products, etag = _request_catalog(etag)
     except requests.exceptions.RequestException as e:
-        print("API FAILURE:", e)
+        _report("API FAILURE:", e)
+        if cache is not None:
+            _report(f"OFFLINE: Using cached catalog of {len(cache['products'])} products")
+            return cache["products"]
         return []
 
+    if products is None:
+        products = cache["products"]
+
+    save_catalog_cache(products, etag, cache_file)
+    return products
+
+
+# ---------------- HELPER: CATALOG CACHE ----------------
+def load_catalog_cache(cache_file=CATALOG_CACHE_FILE):
+    """
+    Loads the on-disk catalog cache
+    Returns: dict with fetched_at, etag and products, or None
+    """
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or "products" not in cache:
+        return None
+
+    cache.setdefault("fetched_at", 0)
+    return cache
+
+
+def save_catalog_cache(products, etag=None, cache_file=CATALOG_CACHE_FILE):
+    """
+    Writes the catalog cache atomically (temp file + rename) so readers
+    never see a partially written file
+    """
+    cache = {
+        "fetched_at": time.time(),
+        "etag": etag,
+        "products": products
+    }
+
+    try:
+        write_text_atomic(cache_file, json.dumps(cache))
+    except OSError as e:
+        _report("CACHE WRITE FAILURE:", e)
+
 
 # ---------------- TASK 3.1 (b) ----------------
-def create_product_mapping(api_products):
+def create_product_mapping(api_products=None):
     """
     Creates mapping of product ID -> product info
+    Loads the catalog through the cache when api_products is None
     """
+    if api_products is None:
+        api_products = fetch_all_products()
+
     product_mapping = {}
 
     for product in api_products:
@@ -72,48 +333,191 @@ def create_product_mapping(api_products):
     return product_mapping
 
 
+class _CatalogFuture(Future):
+    """
+    Future whose worker's messages are printed by result() once the
+    work is done
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = _MessageBuffer()
+
+    def result(self, timeout=None):
+        try:
+            return super().result(timeout)
+        finally:
+            if self.done():
+                self.messages.flush()
+
+
+def start_product_mapping():
+    """
+    Starts create_product_mapping() on a background thread, so the
+    catalog download overlaps reading and parsing the sales file
+    The thread is a daemon, so an early exit does not wait for the
+    download and its retries; its messages print when the result is
+    collected
+    Returns: concurrent.futures.Future for the product mapping
+    """
+    future = _CatalogFuture()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            mapping = _run_buffered(future.messages, create_product_mapping)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(mapping)
+
+    threading.Thread(target=run, name="catalog", daemon=True).start()
+    return future
+
+
 # =========================
 #       TASK 3.2
 # =========================
 
-def enrich_sales_data(transactions, product_mapping):
+API_FIELDS = ["API_Category", "API_Brand", "API_Rating", "API_Match"]
+
+_NO_MATCH = {
+    "API_Category": None,
+    "API_Brand": None,
+    "API_Rating": None,
+    "API_Match": False
+}
+
+
+def _resolve_product(product_id, product_mapping):
+    """
+    Looks up the API columns for one ProductID
+    """
+    # Extract numeric ID from ProductID (P101 → 101)
+    try:
+        numeric_id = int("".join(filter(str.isdigit, product_id)))
+    except (TypeError, ValueError):
+        return _NO_MATCH
+
+    api_product = product_mapping.get(numeric_id)
+    if not api_product:
+        return _NO_MATCH
+
+    return {
+        "API_Category": api_product.get("category"),
+        "API_Brand": api_product.get("brand"),
+        "API_Rating": api_product.get("rating"),
+        "API_Match": True
+    }
+
+
+def _fill_match_stats(stats, total, matched, unmatched_ids):
+    if stats is not None:
+        stats.update({
+            "total": total,
+            "matched": matched,
+            "unmatched": total - matched,
+            "success_rate": (matched / total) * 100 if total else 0,
+            "unmatched_product_ids": sorted(unmatched_ids)
+        })
+
+
+def enrich_sales_data(transactions, product_mapping, in_place=False, stats=None):
     """
     Enriches sales data with API information
+    Works as a hash join: each distinct ProductID is resolved once and
+    its API columns are attached to every matching row. With in_place
+    the input dictionaries are updated instead of copied. If a stats
+    dict is given it is filled with the match statistics.
     """
+    resolved = {}
     enriched_transactions = []
+    matched = 0
 
     for txn in transactions:
-        enriched_txn = txn.copy()
+        product_id = txn.get("ProductID", "")
 
-        try:
-            # Extract numeric ID from ProductID (P101 → 101)
-            product_id_str = txn.get("ProductID", "")
-            numeric_id = int("".join(filter(str.isdigit, product_id_str)))
-
-            api_product = product_mapping.get(numeric_id)
-
-            if api_product:
-                enriched_txn["API_Category"] = api_product["category"]
-                enriched_txn["API_Brand"] = api_product["brand"]
-                enriched_txn["API_Rating"] = api_product["rating"]
-                enriched_txn["API_Match"] = True
-            else:
-                enriched_txn["API_Category"] = None
-                enriched_txn["API_Brand"] = None
-                enriched_txn["API_Rating"] = None
-                enriched_txn["API_Match"] = False
-
-        except Exception:
-            enriched_txn["API_Category"] = None
-            enriched_txn["API_Brand"] = None
-            enriched_txn["API_Rating"] = None
-            enriched_txn["API_Match"] = False
-
-        enriched_transactions.append(enriched_txn)
+        columns = resolved.get(product_id)
+        if columns is None:
+            columns = resolved[product_id] = _resolve_product(product_id, product_mapping)
+
+        if in_place:
+            txn.update(columns)
+            enriched_transactions.append(txn)
+        else:
+            enriched_transactions.append({**txn, **columns})
+
+        if columns["API_Match"]:
+            matched += 1
+
+    unmatched_ids = [pid for pid, columns in resolved.items() if not columns["API_Match"]]
+    _fill_match_stats(stats, len(enriched_transactions), matched, unmatched_ids)
 
     return enriched_transactions
 
 
+def enrich_table(table, product_mapping, stats=None):
+    """
+    Column join of a TransactionTable against the product mapping
+    Resolves each distinct ProductID label once, then expands the
+    result through the ProductID code column
+    Returns: dict of API column name -> list of per-row values
+    """
+    labels = table.labels["ProductID"]
+    codes = table.codes["ProductID"]
+    resolved = [_resolve_product(pid, product_mapping) for pid in labels]
+
+    api_columns = {
+        field: [resolved[c][field] for c in codes]
+        for field in API_FIELDS
+    }
+
+    matched = sum(api_columns["API_Match"])
+    # A shared SymbolTable may hold labels this table never uses
+    present = set(codes)
+    unmatched_ids = [
+        pid for code, (pid, columns) in enumerate(zip(labels, resolved))
+        if code in present and not columns["API_Match"]
+    ]
+    _fill_match_stats(stats, len(codes), matched, unmatched_ids)
+
+    return api_columns
+
+
+def track_enrichment(transactions, product_mapping, summary):
+    """
+    Passes transactions through unchanged while matching each one
+    against the product mapping, for pipelines that never hold the rows
+    Once the stream is exhausted, summary is filled with the same
+    counts summarize_enrichment reports for the enriched rows.
+    """
+    resolved = {}
+    total = 0
+    enriched_count = 0
+    failed_products = set()
+
+    for txn in transactions:
+        product_id = txn.get("ProductID", "")
+
+        matched = resolved.get(product_id)
+        if matched is None:
+            matched = resolved[product_id] = _resolve_product(product_id, product_mapping)["API_Match"]
+
+        total += 1
+        if matched:
+            enriched_count += 1
+        else:
+            failed_products.add(txn["ProductName"])
+
+        yield txn
+
+    summary.update({
+        "total": total,
+        "enriched_count": enriched_count,
+        "failed_products": sorted(failed_products)
+    })
+
+
 # ---------------- HELPER: SAVE TO FILE ----------------
 def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
     """
@@ -0,0 +1,111 @@
+import os
+import random
+from datetime import date, timedelta
+
+
+# =========================
+#   SYNTHETIC SALES DATA
+# =========================
+
+# (ProductID, product names seen in the real data, price range)
+PRODUCTS = [
+    ("P101", ["Laptop", "Laptop,Premium"], (45000, 85000)),
+    ("P102", ["Mouse", "Mouse,Wireless"], (300, 1200)),
+    ("P103", ["Keyboard", "Keyboard,Mechanical"], (1500, 3500)),
+    ("P104", ["Monitor", "Monitor,LED"], (8000, 18000)),
+    ("P105", ["Webcam", "Webcam,HD"], (2500, 4500)),
+    ("P106", ["Headphones"], (1500, 7000)),
+    ("P107", ["USB Cable"], (150, 500)),
+    ("P108", ["External Hard Drive", "External Hard Drive,1TB"], (3000, 9000)),
+    ("P109", ["Wireless Mouse", "Wireless Mouse,Gaming"], (500, 1800)),
+    ("P110", ["Laptop Charger", "Laptop Charger,65W"], (1500, 3000)),
+]
+
+REGIONS = ["North", "South", "East", "West"]
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+
+# Probability of each dirty case the parser and validator handle
+DIRTY_RATES = {
+    "comma_price": 0.08,        # 1,916 instead of 1916
+    "zero_quantity": 0.01,
+    "negative_price": 0.01,
+    "missing_customer": 0.01,
+    "missing_region": 0.01,
+    "bad_transaction_id": 0.01,  # X611 instead of T611
+    "bad_field_count": 0.005,
+    "bad_number": 0.005,         # non-numeric quantity
+}
+
+
+def generate_sales_lines(rows, seed=42, customers=None, days=365, start=date(2024, 1, 1)):
+    """
+    Deterministically generates pipe-delimited sales lines (no header)
+    matching the read_sales_data format, including dirty records
+    """
+    rng = random.Random(seed)
+    customers = customers or max(25, rows // 40)
+    dates = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+    for i in range(1, rows + 1):
+        product_id, names, (low, high) = rng.choice(PRODUCTS)
+        name = rng.choice(names)
+        quantity = str(rng.randint(1, 10))
+        price = str(rng.randint(low, high))
+        customer = f"C{rng.randint(1, customers):03d}"
+        region = rng.choice(REGIONS)
+        transaction_id = f"T{i:03d}"
+
+        roll = rng.random()
+        for case, rate in DIRTY_RATES.items():
+            if roll < rate:
+                break
+            roll -= rate
+        else:
+            case = None
+
+        if case == "comma_price" and len(price) > 3:
+            price = f"{price[:-3]},{price[-3:]}"
+        elif case == "zero_quantity":
+            quantity = "0"
+        elif case == "negative_price":
+            price = "-" + price
+        elif case == "missing_customer":
+            customer = ""
+        elif case == "missing_region":
+            region = ""
+        elif case == "bad_transaction_id":
+            transaction_id = "X" + transaction_id[1:]
+        elif case == "bad_number":
+            quantity = "ten"
+
+        fields = [transaction_id, rng.choice(dates), product_id, name,
+                  quantity, price, customer, region]
+
+        if case == "bad_field_count":
+            fields.pop()
+
+        yield "|".join(fields)
+
+
+def generate_sales_file(filename, rows, seed=42, **kwargs):
+    """
+    Writes a synthetic sales file with a header row
+    Returns: filename
+    """
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+
+    with open(filename, "w", encoding="utf-8", newline="\n") as f:
+        f.write(HEADER + "\n")
+
+        batch = []
+        for line in generate_sales_lines(rows, seed=seed, **kwargs):
+            batch.append(line)
+            if len(batch) >= 10000:
+                f.write("\n".join(batch) + "\n")
+                batch = []
+
+        if batch:
+            f.write("\n".join(batch) + "\n")
+
+    return filename
@@ -1,15 +1,36 @@
+import heapq
+from array import array
+from itertools import islice, repeat
+
+from utils.transaction_table import CATEGORY_FIELDS, TransactionTable, aggregate_table
+from utils.hyperloglog import DEFAULT_PRECISION, HyperLogLog
+from utils.time_series import DailySeries
+from utils.report_renderer import write_reports
+from utils import numpy_backend
+
+
 # =========================
 #       QUESTION 1
 # =========================
 
 
-def parse_and_clean_data(lines):
+def parse_and_clean_data(lines, symbols=None):
     """
     Parses sales data lines, cleans records,
     returns:
     - valid cleaned records
     - invalid records with reasons
+    With a SymbolTable, the categorical fields of cleaned records are
+    its shared objects, as in iter_transactions
     """
+    if symbols is not None:
+        (
+            intern_date,
+            intern_product_id,
+            intern_product_name,
+            intern_customer_id,
+            intern_region
+        ) = map(symbols.interner, CATEGORY_FIELDS)
 
     cleaned_data = []
     removed_data = []
@@ -77,6 +98,13 @@ def parse_and_clean_data(lines):
             removed_data.append((original_line, "UnitPrice ≤ 0"))
             continue
 
+        if symbols is not None:
+            date = intern_date(date)
+            product_id = intern_product_id(product_id)
+            product_name = intern_product_name(product_name)
+            customer_id = intern_customer_id(customer_id)
+            region = intern_region(region)
+
         record = {
             "transaction_id": transaction_id,
             "date": date,
@@ -101,12 +129,22 @@ def parse_and_clean_data(lines):
 # =========================
 
 
-def parse_transactions(raw_lines):
+def iter_transactions(raw_lines, symbols=None):
     """
-    Parses raw lines into clean list of dictionaries
+    Lazily parses raw lines into clean dictionaries
+    Yields one transaction at a time so any iterable of lines,
+    including a file stream, can be processed in constant memory
+    With a SymbolTable, categorical fields are replaced by its shared
+    objects, so each distinct value is stored and hashed only once
     """
-
-    transactions = []
+    if symbols is not None:
+        (
+            intern_date,
+            intern_product_id,
+            intern_product_name,
+            intern_customer_id,
+            intern_region
+        ) = map(symbols.interner, CATEGORY_FIELDS)
 
     for line in raw_lines:
         parts = line.split("|")
@@ -135,7 +173,14 @@ def parse_transactions(raw_lines):
         except ValueError:
             continue
 
-        transaction = {
+        if symbols is not None:
+            date = intern_date(date)
+            product_id = intern_product_id(product_id)
+            product_name = intern_product_name(product_name)
+            customer_id = intern_customer_id(customer_id)
+            region = intern_region(region)
+
+        yield {
             "TransactionID": transaction_id,
             "Date": date,
             "ProductID": product_id,
@@ -146,9 +191,128 @@ def parse_transactions(raw_lines):
             "Region": region
         }
 
-        transactions.append(transaction)
 
-    return transactions
+def _decode_line(line):
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("latin-1")
+
+
+def _decode_lines(raw_lines, batch_size=10000):
+    """
+    Decodes byte lines to str in batches: each batch is joined and
+    decoded in one call, falling back to line-by-line decoding (utf-8,
+    then latin-1) only for a batch that is not valid utf-8
+    Decoded lines are stripped again, since bytes.strip() leaves
+    non-ASCII whitespace (e.g. NBSP, U+0085) that str.strip() removes
+    in the text readers; lines left empty are dropped
+    """
+    raw_lines = iter(raw_lines)
+
+    while True:
+        batch = list(islice(raw_lines, batch_size))
+        if not batch:
+            return
+
+        try:
+            lines = b"\n".join(batch).decode("utf-8").split("\n")
+        except UnicodeDecodeError:
+            lines = map(_decode_line, batch)
+
+        yield from filter(None, map(str.strip, lines))
+
+
+def iter_transactions_bytes(raw_lines):
+    """
+    Lazily parses raw byte lines (e.g. from iter_mmap_lines) with the
+    same rules as iter_transactions
+    Lines are decoded in batches rather than field by field: int() and
+    float() go through str for bytes input anyway, so per-field
+    decoding was measured slower.
+    """
+    return iter_transactions(_decode_lines(raw_lines))
+
+
+def parse_transactions(raw_lines, symbols=None):
+    """
+    Parses raw lines into clean list of dictionaries
+    Pass a SymbolTable to share repeated categorical values
+    """
+    return list(iter_transactions(raw_lines, symbols))
+
+
+class _CleanNames(dict):
+    """
+    Memoizes ProductName cleanup: each distinct raw name is cleaned once
+    """
+
+    def __missing__(self, name):
+        cleaned = self[name] = name.replace(",", "").strip()
+        return cleaned
+
+
+def parse_transactions_table(raw_lines, symbols=None):
+    """
+    Parses raw lines straight into a columnar TransactionTable
+    Fast path: same rows and rejection rules as parse_transactions,
+    but no per-row dictionary is built. Fields are appended to plain
+    column lists and the categorical columns are encoded afterwards in
+    one pass each, with product names cleaned once per distinct value.
+    """
+    transaction_ids = []
+    quantities = array("q")
+    unit_prices = array("d")
+    dates = []
+    product_ids = []
+    product_names = []
+    customer_ids = []
+    regions = []
+
+    for parts in map(str.split, raw_lines, repeat("|")):
+        # Skip rows with incorrect number of fields
+        if len(parts) != 8:
+            continue
+
+        (
+            transaction_id,
+            date,
+            product_id,
+            product_name,
+            quantity,
+            unit_price,
+            customer_id,
+            region
+        ) = parts
+
+        try:
+            quantity = int(quantity)
+            unit_price = float(unit_price.replace(",", ""))
+        except ValueError:
+            continue
+
+        transaction_ids.append(transaction_id)
+        quantities.append(quantity)
+        unit_prices.append(unit_price)
+        dates.append(date)
+        product_ids.append(product_id)
+        product_names.append(product_name)
+        customer_ids.append(customer_id)
+        regions.append(region)
+
+    return TransactionTable.from_columns(
+        transaction_ids,
+        quantities,
+        unit_prices,
+        {
+            "Date": dates,
+            "ProductID": product_ids,
+            "ProductName": map(_CleanNames().__getitem__, product_names),
+            "CustomerID": customer_ids,
+            "Region": regions
+        },
+        symbols
+    )
 
 
 # =========================
@@ -156,6 +320,20 @@ def parse_transactions(raw_lines):
 # =========================
 
 
+def _is_valid_transaction(t):
+    """
+    Basic validation rules shared by the batch and streaming filters
+    """
+    return not (
+        t["Quantity"] <= 0 or
+        t["UnitPrice"] <= 0 or
+        not t["TransactionID"].startswith("T") or
+        not t["ProductID"].startswith("P") or
+        not t["CustomerID"].startswith("C") or
+        not t["Region"].strip()
+    )
+
+
 def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
     valid_transactions = []
     invalid_count = 0
@@ -164,14 +342,7 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 
     # STEP 1: Basic validation only
     for t in transactions:
-        if (
-            t["Quantity"] <= 0 or
-            t["UnitPrice"] <= 0 or
-            not t["TransactionID"].startswith("T") or
-            not t["ProductID"].startswith("P") or
-            not t["CustomerID"].startswith("C") or
-            not t["Region"].strip()
-        ):
+        if not _is_valid_transaction(t):
             invalid_count += 1
             continue
 
@@ -216,47 +387,510 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     return valid_transactions, invalid_count, summary
 
 
+def validate_table_rows(table):
+    """
+    Runs the basic validation rules over a TransactionTable's columns
+    ID and Region checks run once per distinct label rather than per row
+    Returns: (valid row indices, their amounts, invalid_count)
+    """
+    labels = table.labels
+    product_ok = [p.startswith("P") for p in labels["ProductID"]]
+    customer_ok = [c.startswith("C") for c in labels["CustomerID"]]
+    region_ok = [bool(r.strip()) for r in labels["Region"]]
+
+    invalid_count = 0
+    valid_rows = []
+    amounts = []
+
+    for i, (transaction_id, quantity, unit_price, product, customer, region_code) in enumerate(zip(
+        table.transaction_ids,
+        table.quantity,
+        table.unit_price,
+        table.codes["ProductID"],
+        table.codes["CustomerID"],
+        table.codes["Region"]
+    )):
+        if (
+            quantity <= 0 or
+            unit_price <= 0 or
+            not transaction_id.startswith("T") or
+            not product_ok[product] or
+            not customer_ok[customer] or
+            not region_ok[region_code]
+        ):
+            invalid_count += 1
+            continue
+
+        valid_rows.append(i)
+        amounts.append(quantity * unit_price)
+
+    return valid_rows, amounts, invalid_count
+
+
+def validate_and_filter_table(table, region=None, min_amount=None, max_amount=None):
+    """
+    Columnar counterpart of validate_and_filter for a TransactionTable
+    Applies the same rules, prints the same options and returns the
+    same summary
+    Returns: (filtered table sharing the input's codes, invalid_count, summary)
+    """
+    labels = table.labels
+
+    # STEP 1: Basic validation only
+    valid_rows, amounts, invalid_count = validate_table_rows(table)
+
+    # STEP 2: Display options from VALID data only
+    region_codes = table.codes["Region"]
+    regions = sorted({labels["Region"][c] for c in set(map(region_codes.__getitem__, valid_rows))})
+    print("Available regions:", regions)
+    print("Transaction amount range:", min(amounts), "-", max(amounts))
+
+    filtered_by_region = 0
+    filtered_by_amount = 0
+    kept = []
+
+    # STEP 3: Apply optional filters
+    wanted = table.symbols.code_map("Region").get(region, -1) if region else None
+    for i, amount in zip(valid_rows, amounts):
+        if region and region_codes[i] != wanted:
+            filtered_by_region += 1
+            continue
+
+        if min_amount and amount < min_amount:
+            filtered_by_amount += 1
+            continue
+
+        if max_amount and amount > max_amount:
+            filtered_by_amount += 1
+            continue
+
+        kept.append(i)
+
+    summary = {
+        "total_input": len(table),
+        "invalid": invalid_count,
+        "filtered_by_region": filtered_by_region,
+        "filtered_by_amount": filtered_by_amount,
+        "final_count": len(kept)
+    }
+
+    return table.take(kept), invalid_count, summary
+
+
+def iter_valid_transactions(transactions, region=None, min_amount=None,
+                            max_amount=None, summary=None):
+    """
+    Streaming counterpart of validate_and_filter
+    Yields transactions that pass validation and the optional filters
+    without holding any of them in memory. If a summary dict is given
+    it is filled with the same counts validate_and_filter reports,
+    plus the available regions and amount range, once the stream is
+    exhausted.
+    """
+    total_input = 0
+    invalid_count = 0
+    filtered_by_region = 0
+    filtered_by_amount = 0
+    final_count = 0
+
+    regions = set()
+    min_seen = None
+    max_seen = None
+
+    for t in transactions:
+        total_input += 1
+
+        if not _is_valid_transaction(t):
+            invalid_count += 1
+            continue
+
+        amount = t["Quantity"] * t["UnitPrice"]
+
+        regions.add(t["Region"])
+        if min_seen is None or amount < min_seen:
+            min_seen = amount
+        if max_seen is None or amount > max_seen:
+            max_seen = amount
+
+        if region and t["Region"] != region:
+            filtered_by_region += 1
+            continue
+
+        if min_amount and amount < min_amount:
+            filtered_by_amount += 1
+            continue
+
+        if max_amount and amount > max_amount:
+            filtered_by_amount += 1
+            continue
+
+        final_count += 1
+        yield t
+
+    if summary is not None:
+        summary.update({
+            "total_input": total_input,
+            "invalid": invalid_count,
+            "filtered_by_region": filtered_by_region,
+            "filtered_by_amount": filtered_by_amount,
+            "final_count": final_count,
+            "available_regions": sorted(regions),
+            "amount_range": (min_seen, max_seen)
+        })
+
+
+def process_sales_stream(raw_lines, region=None, min_amount=None, max_amount=None,
+                         parser=iter_transactions):
+    """
+    Parses, validates, filters and aggregates raw lines in one lazy pass
+    Memory stays bounded by the size of the rollups, not the input
+    Use parser=iter_transactions_bytes for lines from iter_mmap_lines
+    Returns: (aggregates, summary)
+    """
+    summary = {}
+    transactions = iter_valid_transactions(
+        parser(raw_lines),
+        region=region,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        summary=summary
+    )
+    aggregates = build_sales_aggregates(transactions)
+
+    return aggregates, summary
+
+
 # =========================
-#       TASK 2.1
+#    AGGREGATION ENGINE
 # =========================
 
+# How daily rollups count distinct customers: "exact" keeps a set of
+# CustomerIDs per date, "approximate" a HyperLogLog sketch per date
+DISTINCT_CUSTOMERS = "exact"
+HLL_PRECISION = DEFAULT_PRECISION
 
-def calculate_total_revenue(transactions):
+
+def set_distinct_customers(mode, precision=DEFAULT_PRECISION):
     """
-    Calculates total revenue from all transactions
+    Selects exact ("exact") or HyperLogLog ("approximate") distinct
+    customer counts for the daily rollups
+    Approximate mode uses 2 ** precision bytes per date with a typical
+    error of 1.04 / sqrt(2 ** precision) (about 1.6% at 12)
     """
-    total_revenue = 0.0
+    global DISTINCT_CUSTOMERS, HLL_PRECISION
 
-    for t in transactions:
-        total_revenue += t["Quantity"] * t["UnitPrice"]
+    if mode not in ("exact", "approximate"):
+        raise ValueError(f"Unknown distinct customers mode: {mode}")
 
-    return total_revenue
+    DISTINCT_CUSTOMERS = mode
+    HLL_PRECISION = precision
 
-def region_wise_sales(transactions):
+
+def _new_customer_set():
+    if DISTINCT_CUSTOMERS == "approximate":
+        return HyperLogLog(HLL_PRECISION)
+    return set()
+
+
+def _sketch_daily_customers(aggregates):
     """
-    Analyzes sales by region
+    Replaces exact daily customer sets with sketches in approximate mode
+    (for backends that build sets)
+    """
+    if DISTINCT_CUSTOMERS == "approximate":
+        for entry in aggregates["daily"].values():
+            entry["customers"] = HyperLogLog.from_values(entry["customers"], HLL_PRECISION)
+    return aggregates
+
+
+def build_sales_aggregates(transactions):
+    """
+    Builds region, product, customer and daily rollups
+    in a single pass over the transactions
+    Returns: dictionary of aggregates shared by the Task 2
+    analytics and the sales report
     """
+    total_revenue = 0.0
+    transaction_count = 0
+
     region_data = {}
-    total_revenue = calculate_total_revenue(transactions)
+    product_data = {}
+    customer_data = {}
+    daily_data = {}
 
     for t in transactions:
+        quantity = t["Quantity"]
+        revenue = quantity * t["UnitPrice"]
         region = t["Region"]
-        revenue = t["Quantity"] * t["UnitPrice"]
+        product = t["ProductName"]
+        customer = t["CustomerID"]
+        date = t["Date"]
+
+        total_revenue += revenue
+        transaction_count += 1
 
-        if region not in region_data:
-            region_data[region] = {
+        region_entry = region_data.get(region)
+        if region_entry is None:
+            region_entry = region_data[region] = {
                 "total_sales": 0.0,
                 "transaction_count": 0
             }
+        region_entry["total_sales"] += revenue
+        region_entry["transaction_count"] += 1
 
-        region_data[region]["total_sales"] += revenue
-        region_data[region]["transaction_count"] += 1
+        product_entry = product_data.get(product)
+        if product_entry is None:
+            product_entry = product_data[product] = {
+                "quantity": 0,
+                "revenue": 0.0
+            }
+        product_entry["quantity"] += quantity
+        product_entry["revenue"] += revenue
+
+        customer_entry = customer_data.get(customer)
+        if customer_entry is None:
+            customer_entry = customer_data[customer] = {
+                "total_spent": 0.0,
+                "purchase_count": 0,
+                "products_bought": set()
+            }
+        customer_entry["total_spent"] += revenue
+        customer_entry["purchase_count"] += 1
+        customer_entry["products_bought"].add(product)
 
-    # Calculate percentage
-    for region in region_data:
-        region_data[region]["percentage"] = round(
-            (region_data[region]["total_sales"] / total_revenue) * 100, 2
+        daily_entry = daily_data.get(date)
+        if daily_entry is None:
+            daily_entry = daily_data[date] = {
+                "revenue": 0.0,
+                "transaction_count": 0,
+                "customers": _new_customer_set()
+            }
+        daily_entry["revenue"] += revenue
+        daily_entry["transaction_count"] += 1
+        daily_entry["customers"].add(customer)
+
+    return {
+        "total_revenue": total_revenue,
+        "transaction_count": transaction_count,
+        "regions": region_data,
+        "products": product_data,
+        "customers": customer_data,
+        "daily": daily_data
+    }
+
+
+# Rollup values merged with |= rather than +=
+_MERGEABLE = (set, HyperLogLog)
+
+
+def _merge_rollup(target, other):
+    """
+    Merges one rollup (e.g. aggregates["regions"]) into another
+    Numbers are added, sets are unioned and sketches merged
+    """
+    for key, data in other.items():
+        entry = target.get(key)
+
+        if entry is None:
+            target[key] = {
+                field: value.copy() if isinstance(value, _MERGEABLE) else value
+                for field, value in data.items()
+            }
+            continue
+
+        for field, value in data.items():
+            if isinstance(value, _MERGEABLE):
+                entry[field] |= value
+            else:
+                entry[field] += value
+
+
+def merge_sales_aggregates(target, other):
+    """
+    Merges aggregates built over another slice of the data into target
+    Merging is associative, so partial results from file chunks can be
+    combined in any grouping (sums may differ in the last float digit)
+    Returns: target
+    """
+    target["total_revenue"] += other["total_revenue"]
+    target["transaction_count"] += other["transaction_count"]
+
+    for rollup in ("regions", "products", "customers", "daily"):
+        _merge_rollup(target[rollup], other[rollup])
+
+    return target
+
+
+def merge_stream_summaries(target, other):
+    """
+    Merges a summary filled by iter_valid_transactions into target
+    Returns: target
+    """
+    for key in ("total_input", "invalid", "filtered_by_region",
+                "filtered_by_amount", "final_count"):
+        target[key] = target.get(key, 0) + other[key]
+
+    target["available_regions"] = sorted(
+        set(target.get("available_regions", [])) | set(other["available_regions"])
+    )
+
+    ranges = [r for r in (target.get("amount_range"), other["amount_range"])
+              if r and r[0] is not None]
+    if ranges:
+        target["amount_range"] = (
+            min(r[0] for r in ranges),
+            max(r[1] for r in ranges)
         )
+    else:
+        target["amount_range"] = (None, None)
+
+    return target
+
+
+# Rollup fields that hold sets and must be converted for JSON
+_SET_FIELDS = ("products_bought", "customers")
+
+
+def _field_to_json(value):
+    if isinstance(value, set):
+        return sorted(value)
+    if isinstance(value, HyperLogLog):
+        return value.to_json()
+    return value
+
+
+def _field_from_json(field, value):
+    if field not in _SET_FIELDS:
+        return value
+    if isinstance(value, dict):
+        return HyperLogLog.from_json(value)
+    return set(value)
+
+
+def aggregates_to_json(aggregates):
+    """
+    Converts aggregates into a JSON-serializable dict (sets become
+    lists, sketches become dicts)
+    """
+    data = {
+        "total_revenue": aggregates["total_revenue"],
+        "transaction_count": aggregates["transaction_count"]
+    }
+
+    for rollup in ("regions", "products", "customers", "daily"):
+        data[rollup] = {
+            key: {
+                field: _field_to_json(value)
+                for field, value in entry.items()
+            }
+            for key, entry in aggregates[rollup].items()
+        }
+
+    return data
+
+
+def aggregates_from_json(data):
+    """
+    Rebuilds aggregates saved with aggregates_to_json
+    """
+    aggregates = {
+        "total_revenue": data["total_revenue"],
+        "transaction_count": data["transaction_count"]
+    }
+
+    for rollup in ("regions", "products", "customers", "daily"):
+        aggregates[rollup] = {
+            key: {
+                field: _field_from_json(field, value)
+                for field, value in entry.items()
+            }
+            for key, entry in data[rollup].items()
+        }
+
+    return aggregates
+
+
+# Backend used to build aggregates: "python" or "numpy"
+ANALYTICS_BACKEND = "python"
+
+
+def set_analytics_backend(backend):
+    """
+    Selects the backend for the Task 2 analytics ("python" or "numpy")
+    """
+    global ANALYTICS_BACKEND
+
+    if backend not in ("python", "numpy"):
+        raise ValueError(f"Unknown analytics backend: {backend}")
+
+    if backend == "numpy" and not numpy_backend.is_available():
+        raise ImportError("The numpy backend requires NumPy to be installed")
+
+    ANALYTICS_BACKEND = backend
+
+
+def analytics_settings():
+    """
+    Returns: (backend, distinct customers mode, HLL precision) of this
+    process, for apply_analytics_settings in worker processes
+    """
+    return ANALYTICS_BACKEND, DISTINCT_CUSTOMERS, HLL_PRECISION
+
+
+def apply_analytics_settings(backend, distinct_customers, precision=DEFAULT_PRECISION):
+    """
+    Pool initializer: gives a worker process the parent's settings
+    """
+    set_analytics_backend(backend)
+    set_distinct_customers(distinct_customers, precision)
+
+
+def get_sales_aggregates(transactions):
+    """
+    Builds aggregates with the selected analytics backend
+    Accepts a list of transactions, a TransactionTable or
+    aggregates already built by build_sales_aggregates
+    """
+    if isinstance(transactions, dict):
+        return transactions
+
+    if ANALYTICS_BACKEND == "numpy":
+        if not isinstance(transactions, TransactionTable):
+            transactions = TransactionTable.from_transactions(transactions)
+        return _sketch_daily_customers(numpy_backend.aggregate_table(transactions))
+
+    if isinstance(transactions, TransactionTable):
+        return _sketch_daily_customers(aggregate_table(transactions))
+
+    return build_sales_aggregates(transactions)
+
+
+# =========================
+#       TASK 2.1
+# =========================
+
+
+def calculate_total_revenue(transactions):
+    """
+    Calculates total revenue from all transactions
+    """
+    return get_sales_aggregates(transactions)["total_revenue"]
+
+def region_wise_sales(transactions):
+    """
+    Analyzes sales by region
+    """
+    aggregates = get_sales_aggregates(transactions)
+    total_revenue = aggregates["total_revenue"]
+
+    region_data = {}
+    for region, data in aggregates["regions"].items():
+        region_data[region] = {
+            "total_sales": data["total_sales"],
+            "transaction_count": data["transaction_count"],
+            # Calculate percentage
+            "percentage": round((data["total_sales"] / total_revenue) * 100, 2)
+        }
 
     # Sort by total_sales descending
     sorted_region_data = dict(
@@ -274,31 +908,21 @@ def top_selling_products(transactions, n=5):
     """
     Finds top n products by total quantity sold
     """
-    product_data = {}
-
-    for t in transactions:
-        product = t["ProductName"]
-        quantity = t["Quantity"]
-        revenue = quantity * t["UnitPrice"]
-
-        if product not in product_data:
-            product_data[product] = {
-                "quantity": 0,
-                "revenue": 0.0
-            }
-
-        product_data[product]["quantity"] += quantity
-        product_data[product]["revenue"] += revenue
+    product_data = get_sales_aggregates(transactions)["products"]
 
     result = [
         (product, data["quantity"], data["revenue"])
         for product, data in product_data.items()
     ]
 
-    # Sort by total quantity descending
-    result.sort(key=lambda x: x[1], reverse=True)
+    if ANALYTICS_BACKEND == "numpy":
+        # Partial selection instead of a full sort
+        indices = numpy_backend.top_n_indices([r[1] for r in result], n)
+        return [result[i] for i in indices]
 
-    return result[:n]
+    # Heap selection: O(m log n) instead of sorting every product;
+    # nlargest keeps ties in order, like the stable sort it replaces
+    return heapq.nlargest(n, result, key=lambda x: x[1])
 
 def customer_analysis(transactions):
     """
@@ -306,31 +930,17 @@ def customer_analysis(transactions):
     """
     customer_data = {}
 
-    for t in transactions:
-        customer = t["CustomerID"]
-        revenue = t["Quantity"] * t["UnitPrice"]
-        product = t["ProductName"]
-
-        if customer not in customer_data:
-            customer_data[customer] = {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()
-            }
-
-        customer_data[customer]["total_spent"] += revenue
-        customer_data[customer]["purchase_count"] += 1
-        customer_data[customer]["products_bought"].add(product)
-
     # Final formatting
-    for customer in customer_data:
-        total = customer_data[customer]["total_spent"]
-        count = customer_data[customer]["purchase_count"]
-
-        customer_data[customer]["avg_order_value"] = round(total / count, 2)
-        customer_data[customer]["products_bought"] = list(
-            customer_data[customer]["products_bought"]
-        )
+    for customer, data in get_sales_aggregates(transactions)["customers"].items():
+        total = data["total_spent"]
+        count = data["purchase_count"]
+
+        customer_data[customer] = {
+            "total_spent": total,
+            "purchase_count": count,
+            "products_bought": list(data["products_bought"]),
+            "avg_order_value": round(total / count, 2)
+        }
 
     # Sort by total_spent descending
     sorted_customer_data = dict(
@@ -354,43 +964,41 @@ def daily_sales_trend(transactions):
     """
     daily_data = {}
 
-    for t in transactions:
-        date = t["Date"]
-        revenue = t["Quantity"] * t["UnitPrice"]
-        customer = t["CustomerID"]
-
-        if date not in daily_data:
-            daily_data[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0,
-                "customers": set()
-            }
-
-        daily_data[date]["revenue"] += revenue
-        daily_data[date]["transaction_count"] += 1
-        daily_data[date]["customers"].add(customer)
-
     # Final formatting
-    for date in daily_data:
-        daily_data[date]["unique_customers"] = len(daily_data[date]["customers"])
-        del daily_data[date]["customers"]
+    for date, data in get_sales_aggregates(transactions)["daily"].items():
+        daily_data[date] = {
+            "revenue": data["revenue"],
+            "transaction_count": data["transaction_count"],
+            "unique_customers": len(data["customers"])
+        }
 
     # Sort by date (chronological)
     sorted_daily_data = dict(sorted(daily_data.items()))
 
     return sorted_daily_data
 
+def daily_sales_series(transactions):
+    """
+    Dense date-indexed series with prefix sums over the daily rollup,
+    for range totals, rolling windows and weekly/monthly rollups
+    Returns: DailySeries
+    """
+    return DailySeries(get_sales_aggregates(transactions)["daily"])
+
+
 def find_peak_sales_day(transactions):
     """
     Identifies the date with highest revenue
     """
-    daily_data = daily_sales_trend(transactions)
+    daily_data = get_sales_aggregates(transactions)["daily"]
 
     peak_date = None
     peak_revenue = 0.0
     peak_count = 0
 
-    for date, data in daily_data.items():
+    # Chronological order, so ties go to the earliest date
+    for date in sorted(daily_data):
+        data = daily_data[date]
         if data["revenue"] > peak_revenue:
             peak_revenue = data["revenue"]
             peak_count = data["transaction_count"]
@@ -407,21 +1015,7 @@ def low_performing_products(transactions, threshold=10):
     """
     Identifies products with low sales
     """
-    product_data = {}
-
-    for t in transactions:
-        product = t["ProductName"]
-        quantity = t["Quantity"]
-        revenue = quantity * t["UnitPrice"]
-
-        if product not in product_data:
-            product_data[product] = {
-                "quantity": 0,
-                "revenue": 0.0
-            }
-
-        product_data[product]["quantity"] += quantity
-        product_data[product]["revenue"] += revenue
+    product_data = get_sales_aggregates(transactions)["products"]
 
     result = [
         (product, data["quantity"], data["revenue"])
@@ -435,7 +1029,6 @@ def low_performing_products(transactions, threshold=10):
     return result
 
 from datetime import datetime
-from collections import defaultdict
 
 
 # =========================
@@ -443,141 +1036,149 @@ from collections import defaultdict
 # =========================
 
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+def summarize_enrichment(enriched_transactions):
     """
-    Generates a comprehensive formatted text report
+    Reduces enriched transactions to the counts the report needs
+    """
+    enriched_count = 0
+    failed_products = set()
+
+    for t in enriched_transactions:
+        if t.get('API_Match'):
+            enriched_count += 1
+        else:
+            failed_products.add(t['ProductName'])
+
+    return {
+        "total": len(enriched_transactions),
+        "enriched_count": enriched_count,
+        "failed_products": sorted(failed_products)
+    }
+
+
+def merge_enrichment_summaries(target, other):
+    """
+    Merges one enrichment summary into another
+    Returns: target
+    """
+    target["total"] = target.get("total", 0) + other["total"]
+    target["enriched_count"] = target.get("enriched_count", 0) + other["enriched_count"]
+    target["failed_products"] = sorted(
+        set(target.get("failed_products", [])) | set(other["failed_products"])
+    )
+
+    return target
+
+
+def build_report_data(transactions, enriched_transactions):
+    """
+    Computes every figure of the sales report once
+    transactions may also be aggregates from build_sales_aggregates and
+    enriched_transactions may be a summary from summarize_enrichment
+    Returns: plain dict (JSON-serializable) consumed by the renderers
+    in utils.report_renderer
     """
+    aggregates = get_sales_aggregates(transactions)
 
     # ---------------- BASIC METRICS ----------------
-    total_transactions = len(transactions)
-    total_revenue = sum(t['Quantity'] * t['UnitPrice'] for t in transactions)
+    total_transactions = aggregates["transaction_count"]
+    total_revenue = aggregates["total_revenue"]
     avg_order_value = total_revenue / total_transactions if total_transactions else 0
 
-    dates = [t['Date'] for t in transactions]
-    start_date, end_date = min(dates), max(dates)
+    daily_data = aggregates["daily"]
+    start_date, end_date = min(daily_data), max(daily_data)
 
     # ---------------- REGION ANALYSIS ----------------
-    region_data = defaultdict(lambda: {'sales': 0, 'count': 0})
-    for t in transactions:
-        amount = t['Quantity'] * t['UnitPrice']
-        region_data[t['Region']]['sales'] += amount
-        region_data[t['Region']]['count'] += 1
-
     region_summary = []
-    for region, data in region_data.items():
-        percent = (data['sales'] / total_revenue) * 100 if total_revenue else 0
-        region_summary.append((region, data['sales'], percent, data['count']))
+    for region, data in aggregates["regions"].items():
+        percent = (data['total_sales'] / total_revenue) * 100 if total_revenue else 0
+        region_summary.append({
+            "region": region,
+            "total_sales": data['total_sales'],
+            "percent": percent,
+            "transaction_count": data['transaction_count']
+        })
 
-    region_summary.sort(key=lambda x: x[1], reverse=True)
+    region_summary.sort(key=lambda x: x["total_sales"], reverse=True)
 
     # ---------------- PRODUCT ANALYSIS ----------------
-    product_data = defaultdict(lambda: {'qty': 0, 'revenue': 0})
-    for t in transactions:
-        name = t['ProductName']
-        amount = t['Quantity'] * t['UnitPrice']
-        product_data[name]['qty'] += t['Quantity']
-        product_data[name]['revenue'] += amount
-
-    top_products = sorted(
-        product_data.items(),
-        key=lambda x: x[1]['qty'],
-        reverse=True
-    )[:5]
+    top_products = [
+        {"rank": i, "product": name, "quantity": qty, "revenue": revenue}
+        for i, (name, qty, revenue) in enumerate(top_selling_products(aggregates, n=5), 1)
+    ]
 
     # ---------------- CUSTOMER ANALYSIS ----------------
-    customer_data = defaultdict(lambda: {'spent': 0, 'count': 0})
-    for t in transactions:
-        cid = t['CustomerID']
-        amount = t['Quantity'] * t['UnitPrice']
-        customer_data[cid]['spent'] += amount
-        customer_data[cid]['count'] += 1
-
-    top_customers = sorted(
-        customer_data.items(),
-        key=lambda x: x[1]['spent'],
-        reverse=True
-    )[:5]
+    top_customers = [
+        {
+            "rank": i,
+            "customer": cid,
+            "total_spent": d['total_spent'],
+            "purchase_count": d['purchase_count']
+        }
+        for i, (cid, d) in enumerate(heapq.nlargest(
+            5,
+            aggregates["customers"].items(),
+            key=lambda x: x[1]['total_spent']
+        ), 1)
+    ]
 
     # ---------------- DAILY TREND ----------------
-    daily_data = defaultdict(lambda: {'revenue': 0, 'count': 0, 'customers': set()})
-    for t in transactions:
-        date = t['Date']
-        amount = t['Quantity'] * t['UnitPrice']
-        daily_data[date]['revenue'] += amount
-        daily_data[date]['count'] += 1
-        daily_data[date]['customers'].add(t['CustomerID'])
-
-    daily_summary = sorted(daily_data.items())
+    daily_summary = [
+        {
+            "date": date,
+            "revenue": d['revenue'],
+            "transaction_count": d['transaction_count'],
+            "unique_customers": len(d['customers'])
+        }
+        for date, d in sorted(daily_data.items())
+    ]
 
     best_day = max(daily_data.items(), key=lambda x: x[1]['revenue'])
 
     # ---------------- API ENRICHMENT SUMMARY ----------------
-    enriched_count = sum(1 for t in enriched_transactions if t.get('API_Match'))
-    failed_products = sorted(
-        set(t['ProductName'] for t in enriched_transactions if not t.get('API_Match'))
-    )
-    success_rate = (enriched_count / len(enriched_transactions)) * 100 if enriched_transactions else 0
-
-    # ---------------- WRITE REPORT ----------------
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("=" * 60 + "\n")
-        f.write("           SALES ANALYTICS REPORT\n")
-        f.write(f"     Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"     Records Processed: {total_transactions}\n")
-        f.write("=" * 60 + "\n\n")
-
-        # 1. OVERALL SUMMARY
-        f.write("OVERALL SUMMARY\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
-        f.write(f"Total Transactions:   {total_transactions}\n")
-        f.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
-        f.write(f"Date Range:           {start_date} to {end_date}\n\n")
-
-        # 2. REGION PERFORMANCE
-        f.write("REGION-WISE PERFORMANCE\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"{'Region':<10}{'Sales':>15}{'% Total':>12}{'Txns':>10}\n")
-        for r, s, p, c in region_summary:
-            f.write(f"{r:<10}₹{s:>14,.2f}{p:>11.2f}%{c:>10}\n")
-        f.write("\n")
-
-        # 3. TOP PRODUCTS
-        f.write("TOP 5 PRODUCTS\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"{'Rank':<5}{'Product':<25}{'Qty':>8}{'Revenue':>15}\n")
-        for i, (name, d) in enumerate(top_products, 1):
-            f.write(f"{i:<5}{name:<25}{d['qty']:>8}₹{d['revenue']:>14,.2f}\n")
-        f.write("\n")
-
-        # 4. TOP CUSTOMERS
-        f.write("TOP 5 CUSTOMERS\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"{'Rank':<5}{'Customer':<15}{'Spent':>15}{'Orders':>10}\n")
-        for i, (cid, d) in enumerate(top_customers, 1):
-            f.write(f"{i:<5}{cid:<15}₹{d['spent']:>14,.2f}{d['count']:>10}\n")
-        f.write("\n")
-
-        # 5. DAILY SALES TREND
-        f.write("DAILY SALES TREND\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"{'Date':<12}{'Revenue':>15}{'Txns':>8}{'Customers':>12}\n")
-        for date, d in daily_summary:
-            f.write(f"{date:<12}₹{d['revenue']:>14,.2f}{d['count']:>8}{len(d['customers']):>12}\n")
-        f.write("\n")
-
-        # 6. PRODUCT PERFORMANCE
-        f.write("PRODUCT PERFORMANCE ANALYSIS\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"Best Selling Day: {best_day[0]} (₹{best_day[1]['revenue']:,.2f})\n\n")
-
-        # 7. API SUMMARY
-        f.write("API ENRICHMENT SUMMARY\n")
-        f.write("-" * 60 + "\n")
-        f.write(f"Total Enriched: {enriched_count}\n")
-        f.write(f"Success Rate:  {success_rate:.2f}%\n")
-        f.write("Failed Products:\n")
-        for p in failed_products:
-            f.write(f" - {p}\n")
-
-        f.write("\n--- END OF REPORT ---\n")
+    if isinstance(enriched_transactions, dict):
+        enrichment = enriched_transactions
+    else:
+        enrichment = summarize_enrichment(enriched_transactions)
+
+    enriched_count = enrichment["enriched_count"]
+    total_enriched = enrichment["total"]
+    success_rate = (enriched_count / total_enriched) * 100 if total_enriched else 0
+
+    return {
+        "generated_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "records_processed": total_transactions,
+        "summary": {
+            "total_revenue": total_revenue,
+            "total_transactions": total_transactions,
+            "avg_order_value": avg_order_value,
+            "start_date": start_date,
+            "end_date": end_date
+        },
+        "regions": region_summary,
+        "top_products": top_products,
+        "top_customers": top_customers,
+        "daily": daily_summary,
+        "best_day": {"date": best_day[0], "revenue": best_day[1]['revenue']},
+        "enrichment": {
+            "total": total_enriched,
+            "enriched_count": enriched_count,
+            "success_rate": success_rate,
+            "failed_products": list(enrichment["failed_products"])
+        }
+    }
+
+
+def generate_sales_report(transactions, enriched_transactions,
+                          output_file='output/sales_report.txt', formats=("text",), workers=1):
+    """
+    Generates a comprehensive formatted text report
+    transactions may also be aggregates from build_sales_aggregates and
+    enriched_transactions may be a summary from summarize_enrichment
+    formats may add "json" and "csv" versions, written next to
+    output_file with the matching extension; all are rendered from the
+    same figures, each in one atomic write (in parallel with workers > 1)
+    Returns: list of written filenames
+    """
+    report = build_report_data(transactions, enriched_transactions)
+    return write_reports(report, output_file, formats=formats, workers=workers)
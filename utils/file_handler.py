@@ -1,3 +1,8 @@
+import mmap
+import os
+import tempfile
+
+
 # =========================
 #       TASK 1.1
 # =========================
@@ -25,38 +30,248 @@ def read_sales_file(file_path):
 
     return lines
 
-def read_sales_data(filename):
+READ_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Characters str.splitlines() treats as line breaks but text-mode
+# file iteration does not
+_EXTRA_LINE_BREAKS = "\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+
+def _split_block(block, encoding):
+    """
+    Decodes a block of whole lines and returns its non-empty,
+    non-header lines, stripped
+    """
+    text = block.decode(encoding)
+
+    # splitlines() matches text-mode universal newlines (\n, \r\n and
+    # lone \r) unless one of the extra break characters is present
+    if any(char in text for char in _EXTRA_LINE_BREAKS):
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        raw_lines = text.split("\n")
+    else:
+        raw_lines = text.splitlines()
+
+    lines = list(filter(None, map(str.strip, raw_lines)))
+
+    # Header rows are rare, so only filter when one can be present
+    if "TransactionID" in text:
+        lines = [line for line in lines if not line.startswith("TransactionID")]
+
+    return lines
+
+
+def read_sales_data(filename, stats=None):
     """
     Reads sales data from file handling encoding issues
+    The file is read once in large binary blocks that are split on
+    line boundaries. Blocks are decoded as utf-8 until one fails; the
+    whole file is then treated as latin-1, and only earlier blocks that
+    contained non-ASCII bytes are decoded again (from memory, not disk).
+    If a stats dict is given, the encoding used and the number of
+    encodings tried are recorded in it
     Returns: list of raw transaction lines (strings)
     """
-
-    encodings = ["utf-8", "latin-1", "cp1252"]
+    encoding = "utf-8"
     lines = []
 
-    for enc in encodings:
-        try:
-            with open(filename, "r", encoding=enc, errors="strict") as file:
-                for line in file:
-                    line = line.strip()
+    # (first line index, line count, raw bytes) of non-ASCII utf-8 blocks
+    non_ascii_blocks = []
 
-                    # Skip empty lines
-                    if not line:
-                        continue
+    def add_block(block):
+        nonlocal encoding
 
-                    # Skip header row
-                    if line.startswith("TransactionID"):
-                        continue
+        if encoding == "utf-8":
+            try:
+                block_lines = _split_block(block, "utf-8")
+            except UnicodeDecodeError:
+                encoding = "latin-1"
 
-                    lines.append(line)
+                # Re-decode earlier non-ASCII blocks, last first so
+                # the line indexes stay valid
+                for first, count, raw in reversed(non_ascii_blocks):
+                    lines[first:first + count] = _split_block(raw, "latin-1")
+                non_ascii_blocks.clear()
+            else:
+                if not block.isascii():
+                    non_ascii_blocks.append((len(lines), len(block_lines), block))
+                lines.extend(block_lines)
+                return
+
+        lines.extend(_split_block(block, encoding))
+
+    try:
+        with open(filename, "rb") as file:
+            carry = b""
+
+            while True:
+                data = file.read(READ_BLOCK_SIZE)
+                if not data:
+                    break
+
+                data = carry + data
+                cut = data.rfind(b"\n") + 1
+                if not cut:
+                    carry = data
+                    continue
 
-            # If reading succeeds, stop trying other encodings
-            break
+                carry = data[cut:]
+                add_block(data[:cut])
 
-        except UnicodeDecodeError:
-            continue
-        except FileNotFoundError:
-            print(f"Error: File '{filename}' not found.")
-            return []
+            if carry:
+                add_block(carry)
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return []
+
+    if stats is not None:
+        stats["encoding"] = encoding
+        stats["encoding_attempts"] = 1 if encoding == "utf-8" else 2
 
     return lines
+
+
+def iter_sales_data(filename, start=0, end=None):
+    """
+    Streams sales data lines from file one at a time
+    Each line is decoded as utf-8, falling back to latin-1 for that
+    line only, so the file never has to be re-read or held in memory
+    start/end restrict reading to a byte range from split_file_chunks
+    Yields: raw transaction lines (strings)
+    """
+    try:
+        with open(filename, "rb") as file:
+            file.seek(start)
+            position = start
+
+            for raw in file:
+                if end is not None and position >= end:
+                    break
+                position += len(raw)
+
+                try:
+                    line = raw.decode("utf-8")
+                except UnicodeDecodeError:
+                    line = raw.decode("latin-1")
+
+                line = line.strip()
+
+                # Skip empty lines
+                if not line:
+                    continue
+
+                # Skip header row
+                if line.startswith("TransactionID"):
+                    continue
+
+                yield line
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+
+
+def iter_mmap_lines(filename, start=0, end=None):
+    """
+    Memory-mapped reader for large sales files
+    Line boundaries are found directly in the mapped buffer, window by
+    window, and each line is handed out as bytes without building a
+    str. start/end restrict reading to a byte range (lines starting in
+    it), e.g. from split_file_chunks.
+    Only \n (and \r\n) end a line, as with iter_sales_data.
+    Lines are only stripped of ASCII whitespace here;
+    iter_transactions_bytes strips the rest after decoding.
+    Yields: stripped, non-empty, non-header lines (bytes)
+    """
+    try:
+        with open(filename, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                end = size if end is None else min(end, size)
+                position = start
+
+                while position < end:
+                    # Take a large window and extend it to the end of the
+                    # line it stops in, then split the window in one call
+                    stop = mapped.find(b"\n", min(position + READ_BLOCK_SIZE, end) - 1)
+                    stop = size if stop == -1 else stop + 1
+
+                    block = mapped[position:stop]
+                    position = stop
+
+                    lines = filter(None, map(bytes.strip, block.split(b"\n")))
+                    if b"TransactionID" in block:
+                        lines = [line for line in lines if not line.startswith(b"TransactionID")]
+
+                    yield from lines
+
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+
+
+def split_file_chunks(filename, chunk_count):
+    """
+    Splits a file into byte ranges that start and end on line boundaries
+    Returns: list of (start, end) offsets covering the whole file
+    """
+    size = os.path.getsize(filename)
+    chunk_count = max(1, min(chunk_count, size))
+
+    boundaries = [0]
+    with open(filename, "rb") as file:
+        for i in range(1, chunk_count):
+            offset = max(size * i // chunk_count, boundaries[-1])
+            file.seek(offset)
+
+            # Move to the start of the next full line
+            if offset > 0:
+                file.readline()
+            boundaries.append(min(file.tell(), size))
+
+    boundaries.append(size)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+
+
+def _write_atomic(filename, write, mode, **open_kwargs):
+    """
+    Calls write(f) on a temp file next to filename, then renames it
+    over filename so readers never see a partially written file
+    """
+    directory = os.path.dirname(filename) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            write(f)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_text_atomic(filename, text):
+    """
+    Writes text to filename atomically (temp file + rename) so readers
+    never see a partially written file
+    Raises OSError on failure
+    """
+    _write_atomic(filename, lambda f: f.write(text), "w", encoding="utf-8")
+
+
+def write_bytes_atomic(filename, chunks):
+    """
+    Binary counterpart of write_text_atomic; writes each bytes-like
+    object in chunks in order
+    Raises OSError on failure
+    """
+    _write_atomic(filename, lambda f: f.writelines(chunks), "wb")
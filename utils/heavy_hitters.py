@@ -0,0 +1,130 @@
+import heapq
+
+
+# =========================
+#      HEAVY HITTERS
+# =========================
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary: tracks the heaviest keys of a weighted
+    stream in at most capacity counters
+    Guarantees, with W the total weight seen:
+      - every estimate overcounts by at most its error, and every
+        error is at most W / capacity
+      - any key whose true weight exceeds W / capacity is tracked
+    Weights must be non-negative.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.total_weight = 0
+        self._counters = {}  # key -> [estimate, error]
+        # One (estimate, key) entry per counter; entries may be stale
+        # (below the live estimate), never above it
+        self._heap = []
+
+    def update(self, key, weight=1):
+        """
+        Adds weight to key, evicting the smallest counter if full
+        """
+        self.total_weight += weight
+        counter = self._counters.get(key)
+
+        if counter is not None:
+            counter[0] += weight
+            return
+
+        if len(self._counters) < self.capacity:
+            self._counters[key] = [weight, 0]
+            heapq.heappush(self._heap, (weight, key))
+            return
+
+        # Find the true minimum, refreshing stale heap entries on the way
+        while True:
+            estimate, victim = self._heap[0]
+            live = self._counters[victim][0]
+            if live == estimate:
+                break
+            heapq.heapreplace(self._heap, (live, victim))
+
+        del self._counters[victim]
+        self._counters[key] = [estimate + weight, estimate]
+        heapq.heapreplace(self._heap, (estimate + weight, key))
+
+    def __len__(self):
+        return len(self._counters)
+
+    def __contains__(self, key):
+        return key in self._counters
+
+    @property
+    def error_bound(self):
+        """
+        Maximum overcount of any estimate: total weight / capacity
+        """
+        return self.total_weight / self.capacity
+
+    def estimate(self, key):
+        """
+        Returns: (estimate, error) for a tracked key; the true weight
+        lies in [estimate - error, estimate]. Untracked keys return
+        (0, error_bound)
+        """
+        counter = self._counters.get(key)
+        if counter is None:
+            return 0, self.error_bound
+        return counter[0], counter[1]
+
+    def top(self, n=5):
+        """
+        Returns the n heaviest tracked keys as (key, estimate, error),
+        heaviest first
+        """
+        return [
+            (key, estimate, error)
+            for key, (estimate, error) in heapq.nlargest(
+                n, self._counters.items(), key=lambda x: x[1][0]
+            )
+        ]
+
+    def guaranteed_top(self, n=5):
+        """
+        The subset of top(n) whose rank is certain: each key's lower
+        bound beats the upper bound of every key below it
+        """
+        top = self.top(len(self._counters))
+        result = []
+
+        # Once full, an untracked key may weigh up to the smallest estimate
+        floor = top[-1][1] if len(top) == self.capacity else 0
+
+        for i, (key, estimate, error) in enumerate(top[:n]):
+            below = top[i + 1][1] if i + 1 < len(top) else floor
+            if estimate - error < below:
+                break
+            result.append((key, estimate, error))
+
+        return result
+
+
+def track_heavy_hitters(transactions, capacity=1000):
+    """
+    Streams transactions into bounded-memory heavy-hitter summaries:
+    customers by amount spent and products by quantity sold
+    Memory is capacity counters per summary, however many distinct
+    customers or products the stream holds.
+    Returns: {"customers": SpaceSaving, "products": SpaceSaving}
+    """
+    customers = SpaceSaving(capacity)
+    products = SpaceSaving(capacity)
+
+    for t in transactions:
+        customers.update(t["CustomerID"], t["Quantity"] * t["UnitPrice"])
+        products.update(t["ProductName"], t["Quantity"])
+
+    return {"customers": customers, "products": products}
@@ -0,0 +1,106 @@
+import base64
+import math
+from hashlib import blake2b
+
+
+# =========================
+#   APPROXIMATE DISTINCT
+# =========================
+
+DEFAULT_PRECISION = 12
+
+
+class HyperLogLog:
+    """
+    Fixed-size distinct-count sketch
+    Uses 2 ** precision one-byte registers (4 KB at the default 12) and
+    has a typical relative error of 1.04 / sqrt(2 ** precision), about
+    1.6% at the default. Values are hashed with BLAKE2b, not hash(),
+    so sketches built in different processes can be merged.
+    Supports the parts of the set interface the aggregates use:
+    add(), len() (the rounded estimate), |= (merge) and copy().
+    """
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @property
+    def relative_error(self):
+        """
+        Typical (one standard deviation) relative error of estimates
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, value):
+        h = int.from_bytes(blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = h >> bits
+        # Rank of the first set bit in the remaining bits (1-based)
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def estimate(self):
+        """
+        Returns the estimated number of distinct values added
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate at small cardinalities
+            return m * math.log(m / zeros)
+        return raw
+
+    def __len__(self):
+        return round(self.estimate())
+
+    def merge(self, other):
+        """
+        Folds another sketch of the same precision into this one
+        Returns: self
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def __ior__(self, other):
+        return self.merge(other)
+
+    def copy(self):
+        sketch = HyperLogLog(self.precision)
+        sketch.registers = bytearray(self.registers)
+        return sketch
+
+    @classmethod
+    def from_values(cls, values, precision=DEFAULT_PRECISION):
+        sketch = cls(precision)
+        sketch.update(values)
+        return sketch
+
+    def to_json(self):
+        """
+        Returns a JSON-serializable dict
+        """
+        return {
+            "hll_precision": self.precision,
+            "registers": base64.b64encode(bytes(self.registers)).decode("ascii")
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        sketch = cls(data["hll_precision"])
+        sketch.registers = bytearray(base64.b64decode(data["registers"]))
+        return sketch
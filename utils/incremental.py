@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+from collections import deque
+
+from utils import data_processor
+from utils.file_handler import iter_sales_data, write_text_atomic
+from utils.data_processor import (
+    iter_transactions,
+    iter_valid_transactions,
+    build_sales_aggregates,
+    merge_sales_aggregates,
+    merge_stream_summaries,
+    merge_enrichment_summaries,
+    aggregates_to_json,
+    aggregates_from_json
+)
+
+
+# =========================
+#   INCREMENTAL PROCESSING
+# =========================
+
+CHECKPOINT_FILE = "output/sales_checkpoint.json"
+CHECKPOINT_VERSION = 2
+
+# Bytes hashed at the start of the file and just before the checkpoint
+# offset to detect a rewritten or rotated file; the whole processed
+# prefix is not hashed, so the check costs the same however long it is
+FINGERPRINT_BYTES = 4096
+
+# TransactionIDs remembered from earlier runs, so lines appended again
+# are not counted twice; the window keeps the checkpoint size bounded
+RECENT_IDS = 10000
+
+
+def _fingerprint(filename, end):
+    """
+    Hashes the first and last FINGERPRINT_BYTES of the first end bytes
+    """
+    digest = hashlib.sha256()
+
+    with open(filename, "rb") as f:
+        digest.update(f.read(min(end, FINGERPRINT_BYTES)))
+        tail = max(0, end - FINGERPRINT_BYTES)
+        f.seek(tail)
+        digest.update(f.read(end - tail))
+
+    return digest.hexdigest()
+
+
+def _complete_lines_end(filename, size):
+    """
+    Returns the offset just past the last newline, so a line that is
+    still being written is left for the next run
+    """
+    block = 64 * 1024
+
+    with open(filename, "rb") as f:
+        position = size
+        while position > 0:
+            start = max(0, position - block)
+            f.seek(start)
+            index = f.read(position - start).rfind(b"\n")
+            if index != -1:
+                return start + index + 1
+            position = start
+
+    return 0
+
+
+def _customer_counting():
+    """
+    The distinct-customer setting the daily rollups are built with;
+    exact sets and sketches of another precision cannot be merged
+    """
+    mode = data_processor.DISTINCT_CUSTOMERS
+    return [mode, data_processor.HLL_PRECISION if mode == "approximate" else None]
+
+
+def _new_state(filename, filters):
+    return {
+        "version": CHECKPOINT_VERSION,
+        "source": os.path.abspath(filename),
+        "filters": filters,
+        "customer_counting": _customer_counting(),
+        "offset": 0,
+        "fingerprint": None,
+        "aggregates": build_sales_aggregates([]),
+        "summary": {},
+        "enrichment": {},
+        "recent_ids": [],
+        "duplicates_skipped": 0
+    }
+
+
+def load_checkpoint(checkpoint_file=CHECKPOINT_FILE):
+    """
+    Loads a saved checkpoint
+    Returns: state dict, or None if missing or unreadable
+    """
+    try:
+        with open(checkpoint_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        if state.get("version") != CHECKPOINT_VERSION:
+            return None
+
+        state["aggregates"] = aggregates_from_json(state["aggregates"])
+        if state["summary"].get("amount_range"):
+            state["summary"]["amount_range"] = tuple(state["summary"]["amount_range"])
+
+        return state
+
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_checkpoint(state, checkpoint_file=CHECKPOINT_FILE):
+    """
+    Atomically writes the checkpoint state
+    """
+    data = dict(state)
+    data["aggregates"] = aggregates_to_json(state["aggregates"])
+
+    write_text_atomic(checkpoint_file, json.dumps(data))
+
+
+def _checkpoint_matches(state, filename, size, filters):
+    """
+    Checks that a checkpoint belongs to this file, its content so far,
+    the same filter settings and the same distinct-customer mode
+    """
+    if state["source"] != os.path.abspath(filename) or state["filters"] != filters:
+        return False
+
+    if state.get("customer_counting") != _customer_counting():
+        return False
+
+    if size < state["offset"]:
+        return False
+
+    return _fingerprint(filename, state["offset"]) == state["fingerprint"]
+
+
+def process_sales_incremental(filename, checkpoint_file=CHECKPOINT_FILE,
+                              region=None, min_amount=None, max_amount=None,
+                              enrich=None, stats=None, final=False):
+    """
+    Processes only the lines appended since the last checkpoint and
+    merges them into the saved aggregates
+    Valid transactions whose ID is among the last RECENT_IDS accepted
+    (or earlier in the same delta) are skipped, so re-appended lines are
+    not counted twice. The checkpoint is reset if the file was
+    truncated or rewritten, or the filters or the distinct-customer
+    mode (set_distinct_customers) changed.
+    A last line without a newline may still be being written, so it is
+    left for the next run and reported as pending; with final=True (for
+    files that are no longer growing) the end of the file ends it.
+    enrich, if given, is called with the delta's new transactions and
+    returns a summarize_enrichment summary that is merged into the
+    checkpoint. If a stats dict is given it is filled with new_records,
+    bytes_read, pending_bytes, duplicates_skipped and the running
+    enrichment summary.
+    Returns: (aggregates, summary) covering the whole file
+    """
+    filters = [region, min_amount, max_amount]
+
+    try:
+        size = os.path.getsize(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return build_sales_aggregates([]), {}
+
+    state = load_checkpoint(checkpoint_file)
+    if state is None or not _checkpoint_matches(state, filename, size, filters):
+        state = _new_state(filename, filters)
+
+    start = state["offset"]
+    end = size if final else _complete_lines_end(filename, size)
+
+    recent_ids = deque(state["recent_ids"], maxlen=RECENT_IDS)
+    seen_ids = set(recent_ids)  # grows with the delta only
+    new_transactions = [] if enrich else None
+    duplicates = 0
+
+    def skip_seen(transactions):
+        # Runs after validation, so an invalid row never claims an ID
+        nonlocal duplicates
+        for t in transactions:
+            transaction_id = t["TransactionID"]
+            if transaction_id in seen_ids:
+                duplicates += 1
+                continue
+            seen_ids.add(transaction_id)
+            recent_ids.append(transaction_id)
+            if new_transactions is not None:
+                new_transactions.append(t)
+            yield t
+
+    delta_summary = {}
+    delta = build_sales_aggregates(
+        skip_seen(iter_valid_transactions(
+            iter_transactions(iter_sales_data(filename, start, end)),
+            region=region,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            summary=delta_summary
+        ))
+    )
+    delta_summary["final_count"] -= duplicates
+
+    merge_sales_aggregates(state["aggregates"], delta)
+    merge_stream_summaries(state["summary"], delta_summary)
+    if enrich:
+        merge_enrichment_summaries(state["enrichment"], enrich(new_transactions))
+
+    state["offset"] = end
+    state["fingerprint"] = _fingerprint(filename, end)
+    state["recent_ids"] = list(recent_ids)
+    state["duplicates_skipped"] += duplicates
+
+    if stats is not None:
+        stats.update({
+            "new_records": delta_summary["total_input"],
+            "bytes_read": end - start,
+            "pending_bytes": size - end,
+            "duplicates_skipped": duplicates,
+            "enrichment": state["enrichment"]
+        })
+
+    print(f"Incremental run: {delta_summary['total_input']} new records "
+          f"({end - start} bytes)")
+    if size > end:
+        print(f"Incremental run: {size - end} bytes after the last newline "
+              f"left for the next run (incomplete line)")
+
+    try:
+        save_checkpoint(state, checkpoint_file)
+    except OSError as e:
+        print("CHECKPOINT WRITE FAILURE:", e)
+
+    return state["aggregates"], state["summary"]
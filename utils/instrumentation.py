@@ -0,0 +1,120 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# =========================
+#     INSTRUMENTATION
+# =========================
+
+
+def _peak_rss_kb():
+    """
+    Peak resident set size of this process so far, in KB
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class PipelineInstrumentation:
+    """
+    Records wall time, CPU time, peak RSS and rows in/out per stage
+    Optionally captures a cProfile and tracemalloc peak for each stage.
+    When disabled, stage() does no measurement at all.
+    """
+
+    def __init__(self, enabled=True, profile=False, trace_memory=False,
+                 profile_dir="output/profiles"):
+        self.enabled = enabled
+        self.profile = enabled and profile
+        self.trace_memory = enabled and trace_memory
+        self.profile_dir = profile_dir
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Context manager timing one pipeline stage
+        Yields a dict; set "rows_out" (or any extra field) on it
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+
+        if not self.enabled:
+            yield record
+            return
+
+        profiler = None
+        if self.profile:
+            profiler = cProfile.Profile()
+
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler:
+            profiler.enable()
+
+        try:
+            yield record
+        finally:
+            if profiler:
+                profiler.disable()
+
+            record["wall_seconds"] = time.perf_counter() - wall_start
+            record["cpu_seconds"] = time.process_time() - cpu_start
+            record["peak_rss_kb"] = _peak_rss_kb()
+
+            if self.trace_memory:
+                record["tracemalloc_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                path = os.path.join(self.profile_dir, f"{name}.prof")
+                profiler.dump_stats(path)
+                record["profile"] = path
+
+            self.stages.append(record)
+
+    def report(self):
+        """
+        Returns the timing report as a dict
+        """
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "total_wall_seconds": sum(s["wall_seconds"] for s in self.stages),
+            "total_cpu_seconds": sum(s["cpu_seconds"] for s in self.stages),
+            "stages": self.stages
+        }
+
+    def save(self, filename="output/pipeline_timings.json"):
+        """
+        Writes the JSON timing report; does nothing when disabled
+        """
+        if not self.enabled:
+            return
+
+        if self.trace_memory:
+            tracemalloc.stop()
+
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+        print(f"Timing report saved to {filename}")
@@ -0,0 +1,138 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+# =========================
+#    NUMPY ANALYTICS BACKEND
+# =========================
+
+
+def is_available():
+    """
+    Returns True when NumPy can be imported
+    """
+    return np is not None
+
+
+def _code_column(codes):
+    return np.frombuffer(codes, dtype=np.int32)
+
+
+def _first_appearance_order(codes):
+    """
+    Returns the distinct codes ordered by the row they first appear in
+    """
+    uniq, first_index = np.unique(codes, return_index=True)
+    return uniq[np.argsort(first_index, kind="stable")].tolist()
+
+
+def _group_sets(outer_codes, inner_codes, inner_labels, size):
+    """
+    Collects the distinct inner labels seen for each outer code
+    """
+    width = max(len(inner_labels), 1)
+    pairs = np.unique(outer_codes.astype(np.int64) * width + inner_codes)
+
+    groups = [set() for _ in range(size)]
+    for outer, inner in zip((pairs // width).tolist(), (pairs % width).tolist()):
+        groups[outer].add(inner_labels[inner])
+
+    return groups
+
+
+def aggregate_table(table):
+    """
+    Builds the same aggregates as build_sales_aggregates using
+    np.bincount over the integer code columns of a TransactionTable
+    """
+    labels = table.labels
+    quantity = np.frombuffer(table.quantity, dtype=np.int64)
+    unit_price = np.frombuffer(table.unit_price, dtype=np.float64)
+    revenue = quantity * unit_price
+
+    # cumsum accumulates left to right, matching the Python loop exactly
+    total_revenue = float(np.cumsum(revenue)[-1]) if len(revenue) else 0.0
+
+    region_codes = _code_column(table.codes["Region"])
+    product_codes = _code_column(table.codes["ProductName"])
+    customer_codes = _code_column(table.codes["CustomerID"])
+    date_codes = _code_column(table.codes["Date"])
+
+    # Region rollup
+    size = len(labels["Region"])
+    sales = np.bincount(region_codes, weights=revenue, minlength=size).tolist()
+    counts = np.bincount(region_codes, minlength=size).tolist()
+    region_data = {
+        labels["Region"][c]: {"total_sales": sales[c], "transaction_count": counts[c]}
+        for c in _first_appearance_order(region_codes)
+    }
+
+    # Product rollup
+    size = len(labels["ProductName"])
+    sales = np.bincount(product_codes, weights=revenue, minlength=size).tolist()
+    quantities = np.zeros(size, dtype=np.int64)
+    np.add.at(quantities, product_codes, quantity)
+    quantities = quantities.tolist()
+    product_data = {
+        labels["ProductName"][c]: {"quantity": quantities[c], "revenue": sales[c]}
+        for c in _first_appearance_order(product_codes)
+    }
+
+    # Customer rollup
+    size = len(labels["CustomerID"])
+    sales = np.bincount(customer_codes, weights=revenue, minlength=size).tolist()
+    counts = np.bincount(customer_codes, minlength=size).tolist()
+    bought = _group_sets(customer_codes, product_codes, labels["ProductName"], size)
+    customer_data = {
+        labels["CustomerID"][c]: {
+            "total_spent": sales[c],
+            "purchase_count": counts[c],
+            "products_bought": bought[c]
+        }
+        for c in _first_appearance_order(customer_codes)
+    }
+
+    # Daily rollup
+    size = len(labels["Date"])
+    sales = np.bincount(date_codes, weights=revenue, minlength=size).tolist()
+    counts = np.bincount(date_codes, minlength=size).tolist()
+    customers = _group_sets(date_codes, customer_codes, labels["CustomerID"], size)
+    daily_data = {
+        labels["Date"][c]: {
+            "revenue": sales[c],
+            "transaction_count": counts[c],
+            "customers": customers[c]
+        }
+        for c in _first_appearance_order(date_codes)
+    }
+
+    return {
+        "total_revenue": total_revenue,
+        "transaction_count": len(table),
+        "regions": region_data,
+        "products": product_data,
+        "customers": customer_data,
+        "daily": daily_data
+    }
+
+
+def top_n_indices(values, n):
+    """
+    Returns indices of the n largest values, largest first
+    Ties keep their original order, like a stable descending sort
+    """
+    values = np.asarray(values)
+    if n <= 0 or not len(values):
+        return []
+
+    if n < len(values):
+        # Partial selection; keep every value tied with the n-th largest
+        kth = values[np.argpartition(values, len(values) - n)[len(values) - n]]
+        candidates = np.flatnonzero(values >= kth)
+    else:
+        candidates = np.arange(len(values))
+
+    order = np.lexsort((candidates, -values[candidates]))
+    return candidates[order][:n].tolist()
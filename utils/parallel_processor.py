@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.file_handler import iter_sales_data, iter_mmap_lines, split_file_chunks
+from utils.data_processor import (
+    build_sales_aggregates,
+    iter_transactions,
+    iter_transactions_bytes,
+    iter_valid_transactions,
+    merge_sales_aggregates,
+    merge_stream_summaries,
+    merge_enrichment_summaries,
+    analytics_settings,
+    apply_analytics_settings
+)
+from utils.api_handler import track_enrichment
+
+
+# =========================
+#    PARALLEL PROCESSING
+# =========================
+
+
+def _process_chunk(task):
+    """
+    Worker: parses, validates and aggregates one byte range of the file
+    Returns: (aggregates, summary, enrichment summary or None)
+    """
+    filename, start, end, region, min_amount, max_amount, use_mmap, product_mapping = task
+
+    if use_mmap:
+        lines = iter_mmap_lines(filename, start, end)
+        parser = iter_transactions_bytes
+    else:
+        lines = iter_sales_data(filename, start, end)
+        parser = iter_transactions
+
+    summary = {}
+    transactions = iter_valid_transactions(
+        parser(lines),
+        region=region,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        summary=summary
+    )
+
+    enrichment = None
+    if product_mapping is not None:
+        enrichment = {}
+        transactions = track_enrichment(transactions, product_mapping, enrichment)
+
+    return build_sales_aggregates(transactions), summary, enrichment
+
+
+def process_sales_file_parallel(filename, workers=None, region=None,
+                                min_amount=None, max_amount=None, use_mmap=False,
+                                product_mapping=None, stats=None):
+    """
+    Splits the file into line-aligned byte ranges, processes each range
+    in a worker process and merges the partial aggregates
+    With use_mmap, workers read their range through iter_mmap_lines.
+    With a product_mapping, workers also match their rows against it
+    and stats["enrichment"] receives the merged summarize_enrichment
+    counts; no enriched rows are kept.
+    Returns: (aggregates, summary) like process_sales_stream
+    """
+    workers = workers or os.cpu_count() or 1
+
+    try:
+        chunks = split_file_chunks(filename, workers)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return build_sales_aggregates([]), {}
+
+    tasks = [
+        (filename, start, end, region, min_amount, max_amount, use_mmap, product_mapping)
+        for start, end in chunks
+    ]
+
+    if workers == 1 or len(tasks) <= 1:
+        results = [_process_chunk(task) for task in tasks]
+    else:
+        # Workers use the same analytics settings as this process
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=apply_analytics_settings,
+            initargs=analytics_settings()
+        ) as pool:
+            results = list(pool.map(_process_chunk, tasks))
+
+    # Merge in file order so first-appearance ordering is preserved
+    aggregates = build_sales_aggregates([])
+    summary = {}
+    enrichment = {}
+    for partial, partial_summary, partial_enrichment in results:
+        merge_sales_aggregates(aggregates, partial)
+        merge_stream_summaries(summary, partial_summary)
+        if partial_enrichment is not None:
+            merge_enrichment_summaries(enrichment, partial_enrichment)
+
+    if stats is not None and product_mapping is not None:
+        stats["enrichment"] = enrichment
+
+    return aggregates, summary
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import mmap
+import os
+
+from utils.file_handler import read_sales_data, write_bytes_atomic
+from utils.data_processor import parse_transactions_table
+from utils.transaction_table import CATEGORY_FIELDS, SymbolTable, TransactionTable
+
+
+# =========================
+#    PARSED DATA CACHE
+# =========================
+
+CACHE_DIR = "data/cache"
+CACHE_VERSION = 1
+
+# Cache file layout: 8-byte little-endian header length, JSON header,
+# then each column's raw bytes starting on an 8-byte boundary
+_HEADER_SIZE = 8
+_ALIGNMENT = 8
+
+
+def _cache_path(filename, cache_dir):
+    """
+    One cache file per source path
+    """
+    key = hashlib.sha1(os.path.abspath(filename).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}.cols")
+
+
+def _file_hash(filename):
+    """
+    SHA-256 of the whole file, read in 1 MB blocks
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_info(filename):
+    st = os.stat(filename)
+    return {
+        "path": os.path.abspath(filename),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns
+    }
+
+
+def _columns(table):
+    """
+    Returns (name, typecode, bytes-like) for every stored column
+    """
+    ids = "\n".join(table.transaction_ids).encode("utf-8")
+    columns = [
+        ("transaction_ids", "B", ids),
+        ("quantity", "q", table.quantity),
+        ("unit_price", "d", table.unit_price)
+    ]
+    columns.extend((field, "i", table.codes[field]) for field in CATEGORY_FIELDS)
+    return columns
+
+
+def write_table_cache(cache_file, table, source, raw_lines):
+    """
+    Writes a TransactionTable and its source key to a cache file
+    Raises OSError on failure
+    """
+    layout = {}
+    blobs = []
+    offset = 0
+
+    for name, typecode, data in _columns(table):
+        data = memoryview(data).cast("B")
+        layout[name] = [offset, len(data), typecode]
+        padding = -len(data) % _ALIGNMENT
+        blobs.extend([data, bytes(padding)])
+        offset += len(data) + padding
+
+    header = json.dumps({
+        "version": CACHE_VERSION,
+        "source": source,
+        "rows": len(table),
+        "raw_lines": raw_lines,
+        "columns": layout,
+        "labels": table.labels
+    }).encode("utf-8")
+    header += b" " * (-(_HEADER_SIZE + len(header)) % _ALIGNMENT)
+
+    write_bytes_atomic(
+        cache_file,
+        [len(header).to_bytes(_HEADER_SIZE, "little"), header] + blobs
+    )
+
+
+def read_table_cache(cache_file):
+    """
+    Memory-maps a cache file
+    Numeric and code columns are read-only memoryviews over the map,
+    so nothing is copied until the rows are used.
+    Returns: (header dict, TransactionTable), or None if missing,
+    unreadable or from another cache version
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header_length = int.from_bytes(mapped[:_HEADER_SIZE], "little")
+        header = json.loads(mapped[_HEADER_SIZE:_HEADER_SIZE + header_length])
+        if header.get("version") != CACHE_VERSION:
+            return None
+
+        base = _HEADER_SIZE + header_length
+        view = memoryview(mapped)
+
+        def column(name):
+            offset, length, typecode = header["columns"][name]
+            return view[base + offset:base + offset + length].cast(typecode)
+
+        table = TransactionTable(SymbolTable.from_labels(header["labels"]))
+        ids = bytes(column("transaction_ids")).decode("utf-8")
+        table.transaction_ids = ids.split("\n") if header["rows"] else []
+        table.quantity = column("quantity")
+        table.unit_price = column("unit_price")
+        for field in CATEGORY_FIELDS:
+            table.codes[field] = column(field)
+
+        return header, table
+
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def load_sales_table(filename, cache_dir=CACHE_DIR, stats=None):
+    """
+    Returns the parsed TransactionTable for a sales file, from the
+    cache when the source is unchanged, otherwise by parsing the text
+    and refreshing the cache
+    The source matches on size and mtime; if only the mtime changed,
+    a content hash decides. Cached tables are read-only.
+    Returns: TransactionTable (empty if the file could not be read)
+    """
+    stats = {} if stats is None else stats
+
+    try:
+        source = _source_info(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        stats.update({"cache": "miss", "raw_lines": 0})
+        return TransactionTable()
+
+    cache_file = _cache_path(filename, cache_dir)
+    cached = read_table_cache(cache_file)
+
+    if cached is not None:
+        header, table = cached
+        saved = header["source"]
+
+        if saved["size"] == source["size"] and (
+            saved["mtime_ns"] == source["mtime_ns"] or
+            saved["sha256"] == _file_hash(filename)
+        ):
+            stats.update({"cache": "hit", "raw_lines": header["raw_lines"]})
+            return table
+
+    raw_lines = read_sales_data(filename)
+    table = parse_transactions_table(raw_lines)
+    stats.update({"cache": "miss", "raw_lines": len(raw_lines)})
+
+    if raw_lines:
+        source["sha256"] = _file_hash(filename)
+        try:
+            write_table_cache(cache_file, table, source, len(raw_lines))
+        except OSError as e:
+            print("PARSE CACHE WRITE FAILURE:", e)
+
+    return table
@@ -0,0 +1,186 @@
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.file_handler import write_text_atomic
+
+
+# =========================
+#     REPORT RENDERING
+# =========================
+
+# Renderers take the report dict from build_report_data and return the
+# whole document as one string, so each output is a single write
+
+
+def render_text(report):
+    """
+    Fixed-width text report (the original sales_report.txt layout)
+    """
+    summary = report["summary"]
+    enrichment = report["enrichment"]
+    lines = []
+    add = lines.append
+
+    add("=" * 60)
+    add("           SALES ANALYTICS REPORT")
+    add(f"     Generated: {report['generated_at']}")
+    add(f"     Records Processed: {report['records_processed']}")
+    add("=" * 60)
+    add("")
+
+    # 1. OVERALL SUMMARY
+    add("OVERALL SUMMARY")
+    add("-" * 60)
+    add(f"Total Revenue:        ₹{summary['total_revenue']:,.2f}")
+    add(f"Total Transactions:   {summary['total_transactions']}")
+    add(f"Average Order Value:  ₹{summary['avg_order_value']:,.2f}")
+    add(f"Date Range:           {summary['start_date']} to {summary['end_date']}")
+    add("")
+
+    # 2. REGION PERFORMANCE
+    add("REGION-WISE PERFORMANCE")
+    add("-" * 60)
+    add(f"{'Region':<10}{'Sales':>15}{'% Total':>12}{'Txns':>10}")
+    for r in report["regions"]:
+        add(f"{r['region']:<10}₹{r['total_sales']:>14,.2f}{r['percent']:>11.2f}%{r['transaction_count']:>10}")
+    add("")
+
+    # 3. TOP PRODUCTS
+    add("TOP 5 PRODUCTS")
+    add("-" * 60)
+    add(f"{'Rank':<5}{'Product':<25}{'Qty':>8}{'Revenue':>15}")
+    for p in report["top_products"]:
+        add(f"{p['rank']:<5}{p['product']:<25}{p['quantity']:>8}₹{p['revenue']:>14,.2f}")
+    add("")
+
+    # 4. TOP CUSTOMERS
+    add("TOP 5 CUSTOMERS")
+    add("-" * 60)
+    add(f"{'Rank':<5}{'Customer':<15}{'Spent':>15}{'Orders':>10}")
+    for c in report["top_customers"]:
+        add(f"{c['rank']:<5}{c['customer']:<15}₹{c['total_spent']:>14,.2f}{c['purchase_count']:>10}")
+    add("")
+
+    # 5. DAILY SALES TREND
+    add("DAILY SALES TREND")
+    add("-" * 60)
+    add(f"{'Date':<12}{'Revenue':>15}{'Txns':>8}{'Customers':>12}")
+    for d in report["daily"]:
+        add(f"{d['date']:<12}₹{d['revenue']:>14,.2f}{d['transaction_count']:>8}{d['unique_customers']:>12}")
+    add("")
+
+    # 6. PRODUCT PERFORMANCE
+    add("PRODUCT PERFORMANCE ANALYSIS")
+    add("-" * 60)
+    add(f"Best Selling Day: {report['best_day']['date']} (₹{report['best_day']['revenue']:,.2f})")
+    add("")
+
+    # 7. API SUMMARY
+    add("API ENRICHMENT SUMMARY")
+    add("-" * 60)
+    add(f"Total Enriched: {enrichment['enriched_count']}")
+    add(f"Success Rate:  {enrichment['success_rate']:.2f}%")
+    add("Failed Products:")
+    for p in enrichment["failed_products"]:
+        add(f" - {p}")
+
+    add("")
+    add("--- END OF REPORT ---")
+    return "\n".join(lines) + "\n"
+
+
+def render_json(report):
+    """
+    The report dict as JSON
+    """
+    return json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+
+
+def render_csv(report):
+    """
+    Long-format CSV: one section,key,metric,value row per figure
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(["section", "key", "metric", "value"])
+
+    rows = [("report", "", "generated_at", report["generated_at"])]
+    rows.extend(("summary", "", metric, value) for metric, value in report["summary"].items())
+
+    sections = [
+        ("region", "region", report["regions"]),
+        ("top_product", "product", report["top_products"]),
+        ("top_customer", "customer", report["top_customers"]),
+        ("daily", "date", report["daily"]),
+        ("best_day", "date", [report["best_day"]])
+    ]
+    for section, key_field, entries in sections:
+        for entry in entries:
+            rows.extend(
+                (section, entry[key_field], metric, value)
+                for metric, value in entry.items() if metric != key_field
+            )
+
+    enrichment = report["enrichment"]
+    rows.extend(
+        ("enrichment", "", metric, enrichment[metric])
+        for metric in ("total", "enriched_count", "success_rate")
+    )
+    rows.extend(("enrichment", pid, "failed", 1) for pid in enrichment["failed_products"])
+
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "text": render_text,
+    "json": render_json,
+    "csv": render_csv
+}
+
+EXTENSIONS = {"text": ".txt", "json": ".json", "csv": ".csv"}
+
+
+def report_path(output_file, fmt):
+    """
+    Output path for a format: the text report keeps output_file, other
+    formats swap its extension (sales_report.txt -> sales_report.json)
+    """
+    if fmt == "text":
+        return output_file
+    return os.path.splitext(output_file)[0] + EXTENSIONS[fmt]
+
+
+def _render_job(job):
+    report, fmt, filename = job
+    write_text_atomic(filename, RENDERERS[fmt](report))
+    return filename
+
+
+def render_reports(jobs, workers=1):
+    """
+    Renders and writes (report, format, filename) jobs, each as one
+    atomic write; with workers > 1 the jobs run in worker processes
+    Returns: list of written filenames
+    """
+    for _, fmt, _ in jobs:
+        if fmt not in RENDERERS:
+            raise ValueError(f"Unknown report format: {fmt}")
+
+    if workers == 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_job, jobs))
+
+
+def write_reports(report, output_file, formats=("text",), workers=1):
+    """
+    Writes one report in every requested format next to output_file
+    Returns: list of written filenames
+    """
+    jobs = [(report, fmt, report_path(output_file, fmt)) for fmt in formats]
+    return render_reports(jobs, workers)
@@ -0,0 +1,165 @@
+import heapq
+
+from utils.transaction_table import TransactionTable
+
+
+# =========================
+#      SALES CUBE
+# =========================
+
+DIMENSIONS = ("Region", "ProductName", "CustomerID", "Date")
+MEASURES = ("revenue", "quantity", "transaction_count")
+
+
+class SalesCube:
+    """
+    Pre-aggregated revenue, quantity and transaction count per
+    (Region, ProductName, CustomerID, Date) combination
+    Cells are keyed by tuples of integer codes from the source table's
+    SymbolTable. slice(), roll_up() and drill_down() work on the cells
+    only, so query cost depends on the number of distinct combinations,
+    never on the number of raw rows. Rolled-up sums add cells rather
+    than rows, so they may differ from a row-order sum in the last
+    float digit.
+    """
+
+    def __init__(self, symbols, dimensions, cells, base=None, filters=None):
+        self.symbols = symbols
+        self.dimensions = tuple(dimensions)
+        self.cells = cells  # code tuple -> [revenue, quantity, transaction_count]
+        self._base = base
+        self._filters = dict(filters or {})
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        """
+        Builds the full cube in one pass over a TransactionTable or any
+        iterable of transaction dictionaries
+        """
+        table = transactions
+        if not isinstance(table, TransactionTable):
+            table = TransactionTable.from_transactions(transactions)
+
+        cells = {}
+        keys = zip(*(table.codes[dim] for dim in DIMENSIONS))
+
+        for key, quantity, unit_price in zip(keys, table.quantity, table.unit_price):
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0.0, 0, 0]
+            cell[0] += quantity * unit_price
+            cell[1] += quantity
+            cell[2] += 1
+
+        return cls(table.symbols, DIMENSIONS, cells)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def _base_cube(self):
+        return self._base if self._base is not None else self
+
+    def _wanted_codes(self, dimension, values):
+        lookup = self.symbols.code_map(dimension)
+        # dict.get does not assign codes for unknown values
+        return {lookup.get(value) for value in values} - {None}
+
+    def slice(self, **filters):
+        """
+        Keeps only cells matching every filter, e.g.
+        slice(Region="North") or slice(Date=["2024-12-01", "2024-12-02"])
+        Slices accumulate; slicing on a rolled-up dimension re-slices
+        the base cube.
+        Returns: SalesCube with the same dimensions
+        """
+        merged = dict(self._filters)
+        for dimension, values in filters.items():
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension: {dimension}")
+            values = frozenset([values] if isinstance(values, str) else values)
+            merged[dimension] = merged.get(dimension, values) & values
+
+        if any(dimension not in self.dimensions for dimension in filters):
+            return self._base_cube().slice(**merged).roll_up(*self.dimensions)
+
+        conditions = [
+            (self.dimensions.index(dimension), self._wanted_codes(dimension, merged[dimension]))
+            for dimension in filters
+        ]
+        cells = {
+            key: cell for key, cell in self.cells.items()
+            if all(key[i] in codes for i, codes in conditions)
+        }
+
+        return SalesCube(self.symbols, self.dimensions, cells, self._base_cube(), merged)
+
+    def roll_up(self, *dimensions):
+        """
+        Aggregates away every dimension not listed, e.g.
+        roll_up("Region", "Date") for revenue by region per day
+        Returns: SalesCube over the listed dimensions
+        """
+        for dimension in dimensions:
+            if dimension not in self.dimensions:
+                raise ValueError(f"Cannot roll up to {dimension}: not in this cube")
+
+        positions = [self.dimensions.index(dimension) for dimension in dimensions]
+        cells = {}
+
+        for key, (revenue, quantity, count) in self.cells.items():
+            rolled = tuple(key[i] for i in positions)
+            cell = cells.get(rolled)
+            if cell is None:
+                cells[rolled] = [revenue, quantity, count]
+            else:
+                cell[0] += revenue
+                cell[1] += quantity
+                cell[2] += count
+
+        return SalesCube(self.symbols, dimensions, cells, self._base_cube(), self._filters)
+
+    def drill_down(self, *dimensions):
+        """
+        Adds dimensions back from the base cube, keeping any slices
+        Returns: SalesCube over this cube's dimensions plus the new ones
+        """
+        base = self._base_cube()
+        detail = base.slice(**self._filters) if self._filters else base
+        return detail.roll_up(*(self.dimensions + tuple(
+            dimension for dimension in dimensions if dimension not in self.dimensions
+        )))
+
+    def _labels(self, key):
+        labels = tuple(
+            self.symbols.label(dimension, code)
+            for dimension, code in zip(self.dimensions, key)
+        )
+        return labels[0] if len(labels) == 1 else labels
+
+    def to_dict(self):
+        """
+        Returns: {labels: {revenue, quantity, transaction_count}}; labels
+        is a single value for a one-dimension cube, else a tuple
+        """
+        return {
+            self._labels(key): dict(zip(MEASURES, cell))
+            for key, cell in self.cells.items()
+        }
+
+    def total(self):
+        """
+        Returns: {revenue, quantity, transaction_count} over all cells
+        """
+        totals = [0.0, 0, 0]
+        for cell in self.cells.values():
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return dict(zip(MEASURES, totals))
+
+    def top(self, n=5, measure="revenue"):
+        """
+        Returns the n largest cells by measure as (labels, measures)
+        """
+        index = MEASURES.index(measure)
+        best = heapq.nlargest(n, self.cells.items(), key=lambda item: item[1][index])
+        return [(self._labels(key), dict(zip(MEASURES, cell))) for key, cell in best]
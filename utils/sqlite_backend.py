@@ -0,0 +1,299 @@
+import os
+import sqlite3
+from itertools import islice
+from operator import itemgetter
+
+from utils.transaction_table import TransactionTable
+
+
+# =========================
+#     SQLITE STORAGE
+# =========================
+
+DEFAULT_DB = "data/sales.db"
+BATCH_SIZE = 10000       # rows per executemany call
+
+COLUMNS = ("TransactionID", "Date", "ProductID", "ProductName",
+           "Quantity", "UnitPrice", "CustomerID", "Region")
+
+# WAL with synchronous=NORMAL syncs at checkpoints instead of on every
+# commit; temp B-trees (index builds, GROUP BY sorts) stay in memory
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536"  # 64 MB page cache
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    TransactionID TEXT NOT NULL,
+    Date TEXT NOT NULL,
+    ProductID TEXT NOT NULL,
+    ProductName TEXT NOT NULL,
+    Quantity INTEGER NOT NULL,
+    UnitPrice REAL NOT NULL,
+    CustomerID TEXT NOT NULL,
+    Region TEXT NOT NULL
+)
+"""
+
+INDEXES = {
+    "idx_transactions_date": "Date",
+    "idx_transactions_region": "Region",
+    "idx_transactions_product": "ProductID",
+    "idx_transactions_customer": "CustomerID"
+}
+
+_INSERT = (
+    f"INSERT INTO transactions ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(COLUMNS))})"
+)
+
+_REVENUE = "Quantity * UnitPrice"
+
+
+def connect(db_file=DEFAULT_DB):
+    """
+    Opens (creating if needed) a sales database with the bulk-load
+    pragmas applied and any missing indexes recreated, e.g. after a
+    load that was interrupted before its rebuild
+    Returns: sqlite3.Connection
+    """
+    directory = os.path.dirname(db_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_file)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    conn.execute(_SCHEMA)
+    create_indexes(conn)
+    return conn
+
+
+def create_indexes(conn):
+    with conn:
+        for name, column in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON transactions ({column})")
+
+
+def drop_indexes(conn):
+    with conn:
+        for name in INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def _rows(transactions):
+    """
+    Yields insert tuples from a TransactionTable or transaction dicts
+    """
+    if isinstance(transactions, TransactionTable):
+        table = transactions
+        return zip(
+            table.transaction_ids, table.column("Date"), table.column("ProductID"),
+            table.column("ProductName"), table.quantity, table.unit_price,
+            table.column("CustomerID"), table.column("Region")
+        )
+    return map(itemgetter(*COLUMNS), transactions)
+
+
+def load_transactions(conn, transactions, replace=False, batch_size=BATCH_SIZE, stats=None):
+    """
+    Bulk-loads validated transactions (validate_and_filter output, a
+    TransactionTable or a lazy iter_valid_transactions stream) with
+    batched executemany calls inside a single transaction
+    Loads into an empty table (or with replace=True) drop the indexes,
+    rebuild them once afterwards and refresh the planner statistics;
+    appends keep the indexes in place. The indexes are rebuilt even
+    when the load fails and is rolled back.
+    Returns: number of rows loaded
+    """
+    stats = {} if stats is None else stats
+    loaded = 0
+    batches = 0
+
+    empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM transactions)").fetchone()[0]
+    rebuild = replace or empty
+    if rebuild:
+        drop_indexes(conn)
+
+    try:
+        rows = _rows(transactions)
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM transactions")
+
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(_INSERT, batch)
+                loaded += len(batch)
+                batches += 1
+    finally:
+        if rebuild:
+            create_indexes(conn)
+
+    if rebuild:
+        conn.execute("ANALYZE")
+    else:
+        # Re-analyzes only tables whose statistics are out of date,
+        # instead of rescanning every index after each small append
+        conn.execute("PRAGMA optimize")
+
+    stats.update({"rows_loaded": loaded, "batches": batches})
+    return loaded
+
+
+def load_sales_db(transactions, db_file=DEFAULT_DB, replace=False, stats=None):
+    """
+    Opens db_file and loads transactions into it
+    Returns: the open sqlite3.Connection, ready for the sql_* analytics
+    """
+    conn = connect(db_file)
+    load_transactions(conn, transactions, replace=replace, stats=stats)
+    return conn
+
+
+# =========================
+#     SQL ANALYTICS
+# =========================
+
+# SQL equivalents of the Task 2 analytics. Each takes an open
+# connection plus optional start / end (inclusive ISO dates) and region
+# filters served by the indexes, and returns the same shape as its
+# in-memory counterpart. Ties keep first-loaded order, like the stable
+# Python sorts. SQLite sums in its own scan order, so revenue may
+# differ from the Python totals in the last float digit.
+
+
+def _where(start=None, end=None, region=None):
+    """
+    Returns: (WHERE clause, parameters) for the optional filters
+    """
+    conditions = []
+    params = []
+
+    if start is not None:
+        conditions.append("Date >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("Date <= ?")
+        params.append(end)
+    if region is not None:
+        conditions.append("Region = ?")
+        params.append(region)
+
+    clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return clause, params
+
+
+def sql_total_revenue(conn, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    row = conn.execute(
+        f"SELECT TOTAL({_REVENUE}) FROM transactions {where}", params
+    ).fetchone()
+    return row[0]
+
+
+def sql_region_wise_sales(conn, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    rows = conn.execute(
+        f"SELECT Region, TOTAL({_REVENUE}) AS sales, COUNT(*) FROM transactions {where} "
+        f"GROUP BY Region ORDER BY sales DESC, MIN(rowid)",
+        params
+    ).fetchall()
+
+    total_revenue = sql_total_revenue(conn, start, end, region)
+
+    return {
+        name: {
+            "total_sales": sales,
+            "transaction_count": count,
+            "percentage": round((sales / total_revenue) * 100, 2)
+        }
+        for name, sales, count in rows
+    }
+
+
+def sql_top_selling_products(conn, n=5, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    return conn.execute(
+        f"SELECT ProductName, SUM(Quantity) AS qty, TOTAL({_REVENUE}) FROM transactions {where} "
+        f"GROUP BY ProductName ORDER BY qty DESC, MIN(rowid) LIMIT ?",
+        params + [n]
+    ).fetchall()
+
+
+def sql_customer_analysis(conn, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    # char(31) separates product names, which may contain commas
+    rows = conn.execute(
+        f"""
+        WITH filtered AS (SELECT rowid, * FROM transactions {where})
+        SELECT c.CustomerID, c.spent, c.orders, p.products
+        FROM (
+            SELECT CustomerID, TOTAL({_REVENUE}) AS spent, COUNT(*) AS orders,
+                   MIN(rowid) AS first_row
+            FROM filtered GROUP BY CustomerID
+        ) AS c
+        JOIN (
+            SELECT CustomerID, group_concat(ProductName, char(31)) AS products
+            FROM (SELECT DISTINCT CustomerID, ProductName FROM filtered)
+            GROUP BY CustomerID
+        ) AS p USING (CustomerID)
+        ORDER BY c.spent DESC, c.first_row
+        """,
+        params
+    ).fetchall()
+
+    return {
+        customer: {
+            "total_spent": spent,
+            "purchase_count": orders,
+            "products_bought": products.split("\x1f"),
+            "avg_order_value": round(spent / orders, 2)
+        }
+        for customer, spent, orders, products in rows
+    }
+
+
+def sql_daily_sales_trend(conn, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    rows = conn.execute(
+        f"SELECT Date, TOTAL({_REVENUE}), COUNT(*), COUNT(DISTINCT CustomerID) "
+        f"FROM transactions {where} GROUP BY Date ORDER BY Date",
+        params
+    )
+
+    return {
+        date: {
+            "revenue": revenue,
+            "transaction_count": count,
+            "unique_customers": customers
+        }
+        for date, revenue, count, customers in rows
+    }
+
+
+def sql_find_peak_sales_day(conn, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    row = conn.execute(
+        f"SELECT Date, TOTAL({_REVENUE}) AS revenue, COUNT(*) FROM transactions {where} "
+        f"GROUP BY Date ORDER BY revenue DESC, Date LIMIT 1",
+        params
+    ).fetchone()
+
+    if row is None or row[1] <= 0:
+        return None, 0.0, 0
+    return row
+
+
+def sql_low_performing_products(conn, threshold=10, start=None, end=None, region=None):
+    where, params = _where(start, end, region)
+    return conn.execute(
+        f"SELECT ProductName, SUM(Quantity) AS qty, TOTAL({_REVENUE}) FROM transactions {where} "
+        f"GROUP BY ProductName HAVING qty < ? ORDER BY qty, MIN(rowid)",
+        params + [threshold]
+    ).fetchall()
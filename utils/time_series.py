@@ -0,0 +1,176 @@
+from datetime import date, timedelta
+from itertools import accumulate
+
+
+# =========================
+#    DAILY TIME SERIES
+# =========================
+
+
+def _to_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+class DailySeries:
+    """
+    Dense day-by-day revenue and transaction count series with prefix
+    sums, built once from a daily rollup
+    Days without sales are zero. Any date-range total is O(1); rolling
+    windows and calendar rollups are O(days). Range totals are prefix
+    sum differences, so they may differ from a direct sum in the last
+    float digit.
+    Dates that are not ISO formatted are left out and listed in
+    self.unparsed.
+    """
+
+    def __init__(self, daily):
+        parsed = {}
+        self.unparsed = []
+
+        for key, data in daily.items():
+            try:
+                parsed[date.fromisoformat(key)] = data
+            except (TypeError, ValueError):
+                self.unparsed.append(key)
+
+        if parsed:
+            self.start, self.end = min(parsed), max(parsed)
+            days = (self.end - self.start).days + 1
+        else:
+            self.start = self.end = None
+            days = 0
+
+        self.revenue = [0.0] * days
+        self.transaction_count = [0] * days
+        for day, data in parsed.items():
+            i = (day - self.start).days
+            self.revenue[i] = data["revenue"]
+            self.transaction_count[i] = data["transaction_count"]
+
+        # cum[i] is the total of days [0, i)
+        self._revenue_cum = list(accumulate(self.revenue, initial=0.0))
+        self._count_cum = list(accumulate(self.transaction_count, initial=0))
+
+    def __len__(self):
+        return len(self.revenue)
+
+    def dates(self):
+        """
+        Returns every day of the series as ISO strings
+        """
+        return [(self.start + timedelta(days=i)).isoformat() for i in range(len(self))]
+
+    def _offsets(self, start, end):
+        """
+        Clamps an inclusive date range to the series
+        Returns: half-open (i, j) offsets into the dense arrays
+        """
+        if not len(self):
+            return 0, 0
+
+        i = 0 if start is None else (_to_date(start) - self.start).days
+        j = len(self) if end is None else (_to_date(end) - self.start).days + 1
+        i = min(max(i, 0), len(self))
+        j = min(max(j, i), len(self))
+        return i, j
+
+    def total(self, start=None, end=None):
+        """
+        Revenue and transaction count from start to end inclusive
+        (dates or ISO strings; None means the edge of the series)
+        """
+        i, j = self._offsets(start, end)
+        return {
+            "revenue": self._revenue_cum[j] - self._revenue_cum[i],
+            "transaction_count": self._count_cum[j] - self._count_cum[i]
+        }
+
+    def rolling(self, window=7):
+        """
+        Trailing window totals for every day, e.g. 7- or 30-day moving
+        revenue; the first window - 1 days cover fewer days
+        Returns: dict of ISO date -> {revenue, transaction_count}
+        """
+        result = {}
+        for j, day in enumerate(self.dates(), 1):
+            i = max(0, j - window)
+            result[day] = {
+                "revenue": self._revenue_cum[j] - self._revenue_cum[i],
+                "transaction_count": self._count_cum[j] - self._count_cum[i]
+            }
+        return result
+
+    def peak_day(self):
+        """
+        Same result as find_peak_sales_day: the earliest date with the
+        highest revenue
+        Returns: (date, revenue, transaction_count), or (None, 0.0, 0)
+        """
+        peak = None
+        peak_revenue = 0.0
+
+        for i, revenue in enumerate(self.revenue):
+            if revenue > peak_revenue:
+                peak, peak_revenue = i, revenue
+
+        if peak is None:
+            return None, 0.0, 0
+
+        day = (self.start + timedelta(days=peak)).isoformat()
+        return day, peak_revenue, self.transaction_count[peak]
+
+    def rollup(self, period="month"):
+        """
+        Calendar totals by "week" (ISO week, keys like 2024-W49) or
+        "month" (keys like 2024-12)
+        Returns: dict of period -> {revenue, transaction_count}
+        """
+        if period not in ("week", "month"):
+            raise ValueError(f"Unknown period: {period}")
+
+        result = {}
+        i = 0
+        while i < len(self):
+            day = self.start + timedelta(days=i)
+            if period == "week":
+                year, week, weekday = day.isocalendar()
+                key = f"{year}-W{week:02d}"
+                j = i + 8 - weekday
+            else:
+                key = f"{day.year}-{day.month:02d}"
+                next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+                j = i + (next_month - day).days
+
+            j = min(j, len(self))
+            result[key] = {
+                "revenue": self._revenue_cum[j] - self._revenue_cum[i],
+                "transaction_count": self._count_cum[j] - self._count_cum[i]
+            }
+            i = j
+
+        return result
+
+    def week_over_week(self, day=None):
+        """
+        Revenue for the 7 days ending on day (default: last day) against
+        the 7 days before
+        Returns: dict with current, previous and change_pct (None when
+        the previous week had no revenue)
+        """
+        day = self.end if day is None else _to_date(day)
+        if day is None:
+            return {"current": 0.0, "previous": 0.0, "change_pct": None}
+
+        current = self.total(day - timedelta(days=6), day)["revenue"]
+        previous = self.total(day - timedelta(days=13), day - timedelta(days=7))["revenue"]
+        change = (current - previous) / previous * 100 if previous else None
+        return {"current": current, "previous": previous, "change_pct": change}
+
+    def month_to_date(self, day=None):
+        """
+        Totals from the first of day's month through day (default: last day)
+        """
+        day = self.end if day is None else _to_date(day)
+        if day is None:
+            return self.total()
+        return self.total(day.replace(day=1), day)
@@ -0,0 +1,107 @@
+from bisect import bisect_left, bisect_right
+
+from utils.data_processor import _is_valid_transaction, validate_table_rows
+from utils.transaction_table import TransactionTable
+
+
+# =========================
+#      QUERY INDEX
+# =========================
+
+
+class TransactionIndex:
+    """
+    Validates transactions once and indexes the valid rows for
+    repeated region / amount-range queries
+    Each region keeps its rows sorted by amount, so any query is two
+    binary searches; only returning the rows costs more than O(log n).
+    Queries follow validate_and_filter: empty or zero filters are ignored,
+    and region is applied before the amount bounds.
+    """
+
+    def __init__(self, transactions):
+        self.transactions = transactions
+        self.total_input = len(transactions)
+
+        if isinstance(transactions, TransactionTable):
+            positions, amounts, self.invalid_count = validate_table_rows(transactions)
+            region_labels = transactions.labels["Region"]
+            region_codes = transactions.codes["Region"]
+            regions = [region_labels[region_codes[i]] for i in positions]
+        else:
+            positions, amounts, regions = [], [], []
+            for i, t in enumerate(transactions):
+                if _is_valid_transaction(t):
+                    positions.append(i)
+                    amounts.append(t["Quantity"] * t["UnitPrice"])
+                    regions.append(t["Region"])
+            self.invalid_count = self.total_input - len(positions)
+
+        self.valid_count = len(positions)
+        self.available_regions = sorted(set(regions))
+        self.amount_range = (min(amounts), max(amounts)) if amounts else (None, None)
+
+        # (sorted amounts, row positions in the same order) overall and per region
+        self._all = self._sorted_by_amount(positions, amounts)
+        grouped = {}
+        for position, amount, region in zip(positions, amounts, regions):
+            group = grouped.setdefault(region, ([], []))
+            group[0].append(position)
+            group[1].append(amount)
+        self._by_region = {
+            region: self._sorted_by_amount(*group) for region, group in grouped.items()
+        }
+
+    @staticmethod
+    def _sorted_by_amount(positions, amounts):
+        order = sorted(range(len(amounts)), key=amounts.__getitem__)
+        return [amounts[i] for i in order], [positions[i] for i in order]
+
+    def _match(self, region, min_amount, max_amount):
+        """
+        Returns: (rows in the region, sorted row positions, lo, hi) where
+        positions[lo:hi] are the rows within the amount bounds
+        """
+        if region:
+            amounts, positions = self._by_region.get(region, ([], []))
+        else:
+            amounts, positions = self._all
+
+        lo = bisect_left(amounts, min_amount) if min_amount else 0
+        hi = bisect_right(amounts, max_amount) if max_amount else len(amounts)
+        return len(amounts), positions, lo, max(lo, hi)
+
+    def summary(self, region=None, min_amount=None, max_amount=None):
+        """
+        Returns the validate_and_filter summary for a query in O(log n)
+        """
+        in_region, _, lo, hi = self._match(region, min_amount, max_amount)
+        return {
+            "total_input": self.total_input,
+            "invalid": self.invalid_count,
+            "filtered_by_region": self.valid_count - in_region,
+            "filtered_by_amount": in_region - (hi - lo),
+            "final_count": hi - lo
+        }
+
+    def positions(self, region=None, min_amount=None, max_amount=None):
+        """
+        Returns the matching row positions in file order
+        """
+        _, positions, lo, hi = self._match(region, min_amount, max_amount)
+        return sorted(positions[lo:hi])
+
+    def query(self, region=None, min_amount=None, max_amount=None):
+        """
+        Same result as validate_and_filter, without rescanning the rows
+        Returns: (matching transactions, invalid_count, summary); the
+        transactions are a list, or a TransactionTable for table input
+        """
+        rows = self.positions(region, min_amount, max_amount)
+
+        if isinstance(self.transactions, TransactionTable):
+            matched = self.transactions.take(rows)
+        else:
+            matched = [self.transactions[i] for i in rows]
+
+        return matched, self.invalid_count, self.summary(region, min_amount, max_amount)
@@ -0,0 +1,330 @@
+from array import array
+
+
+# =========================
+#    COLUMNAR STORAGE
+# =========================
+
+# Categorical columns are dictionary-encoded: each distinct value is
+# stored once in a label list and rows hold a small integer code
+CATEGORY_FIELDS = ["Date", "ProductID", "ProductName", "CustomerID", "Region"]
+
+
+class _CodeMap(dict):
+    """
+    Value -> code dict that assigns the next code to unseen values
+    Lookups through map(codes.__getitem__, column) stay in C for values
+    already seen; labels[code] is the shared object for each value.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.labels = []
+
+    def __missing__(self, value):
+        code = self[value] = len(self.labels)
+        self.labels.append(value)
+        return code
+
+
+class _SharedValues(dict):
+    """
+    Value -> shared object cache in front of a _CodeMap
+    """
+
+    def __init__(self, codes):
+        super().__init__()
+        self._codes = codes
+
+    def __missing__(self, value):
+        codes = self._codes
+        shared = self[value] = codes.labels[codes[value]]
+        return shared
+
+
+# =========================
+#      SYMBOL TABLE
+# =========================
+
+
+class SymbolTable:
+    """
+    Per-field dictionary of categorical values
+    Maps each distinct value to a small integer code and one shared
+    string object, so repeated Dates, IDs and Regions are stored once
+    and hashed once. Code order is first-appearance order.
+    """
+
+    def __init__(self, fields=CATEGORY_FIELDS):
+        self._codes = {field: _CodeMap() for field in fields}
+        self._shared = {field: _SharedValues(self._codes[field]) for field in fields}
+
+    @classmethod
+    def from_labels(cls, labels):
+        """
+        Rebuilds a symbol table from saved {field: label list}
+        """
+        symbols = cls(list(labels))
+        for field, values in labels.items():
+            for value in values:
+                symbols.encode(field, value)
+        return symbols
+
+    def encode(self, field, value):
+        """
+        Returns the integer code for value, assigning a new one if needed
+        """
+        return self._codes[field][value]
+
+    def intern(self, field, value):
+        """
+        Returns the shared object equal to value
+        """
+        return self._shared[field][value]
+
+    def interner(self, field):
+        """
+        Returns a one-argument intern function for a field, for hot loops
+        """
+        return self._shared[field].__getitem__
+
+    def label(self, field, code):
+        """
+        Returns the value for a code
+        """
+        return self._codes[field].labels[code]
+
+    def labels(self, field):
+        """
+        Returns the live label list of a field, indexed by code
+        """
+        return self._codes[field].labels
+
+    def code_map(self, field):
+        """
+        Returns the value -> code dict of a field; indexing it with an
+        unseen value assigns the next code
+        """
+        return self._codes[field]
+
+
+class TransactionTable:
+    """
+    Compact column store for parsed transactions
+    Quantity and UnitPrice live in typed arrays, categorical fields
+    are stored as integer codes into a SymbolTable's label lists.
+    Tables built with the same SymbolTable share their codes.
+    """
+
+    def __init__(self, symbols=None):
+        self.transaction_ids = []
+        self.quantity = array("q")
+        self.unit_price = array("d")
+
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        self.codes = {field: array("i") for field in CATEGORY_FIELDS}
+        self.labels = {field: self.symbols.labels(field) for field in CATEGORY_FIELDS}
+
+    @classmethod
+    def from_transactions(cls, transactions, symbols=None):
+        """
+        Builds a table from any iterable of transaction dictionaries
+        """
+        table = cls(symbols)
+        for t in transactions:
+            table.append(t)
+        return table
+
+    @classmethod
+    def from_columns(cls, transaction_ids, quantity, unit_price, columns, symbols=None):
+        """
+        Builds a table from already parsed columns
+        columns maps each CATEGORY_FIELDS name to its raw values; codes
+        are assigned in first-appearance order, as append() does.
+        """
+        table = cls(symbols)
+        table.transaction_ids = list(transaction_ids)
+        table.quantity = array("q", quantity)
+        table.unit_price = array("d", unit_price)
+
+        for field in CATEGORY_FIELDS:
+            lookup = table.symbols.code_map(field)
+            table.codes[field] = array("i", map(lookup.__getitem__, columns[field]))
+
+        return table
+
+    def encode(self, field, value):
+        """
+        Returns the integer code for value, assigning a new one if needed
+        """
+        return self.symbols.encode(field, value)
+
+    def take(self, indices):
+        """
+        Returns a new table with the given rows, sharing this table's
+        SymbolTable (and so its codes)
+        """
+        table = TransactionTable(self.symbols)
+        table.transaction_ids = list(map(self.transaction_ids.__getitem__, indices))
+        table.quantity = array("q", map(self.quantity.__getitem__, indices))
+        table.unit_price = array("d", map(self.unit_price.__getitem__, indices))
+
+        for field in CATEGORY_FIELDS:
+            table.codes[field] = array("i", map(self.codes[field].__getitem__, indices))
+
+        return table
+
+    def append(self, t):
+        """
+        Appends one transaction dictionary to the table
+        """
+        self.transaction_ids.append(t["TransactionID"])
+        self.quantity.append(t["Quantity"])
+        self.unit_price.append(t["UnitPrice"])
+
+        for field in CATEGORY_FIELDS:
+            self.codes[field].append(self.encode(field, t[field]))
+
+    def __len__(self):
+        return len(self.transaction_ids)
+
+    def row(self, i):
+        """
+        Decodes row i back into a transaction dictionary
+        """
+        labels = self.labels
+        codes = self.codes
+        return {
+            "TransactionID": self.transaction_ids[i],
+            "Date": labels["Date"][codes["Date"][i]],
+            "ProductID": labels["ProductID"][codes["ProductID"][i]],
+            "ProductName": labels["ProductName"][codes["ProductName"][i]],
+            "Quantity": self.quantity[i],
+            "UnitPrice": self.unit_price[i],
+            "CustomerID": labels["CustomerID"][codes["CustomerID"][i]],
+            "Region": labels["Region"][codes["Region"][i]]
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def column(self, field):
+        """
+        Returns the decoded values of a categorical column
+        """
+        labels = self.labels[field]
+        return [labels[c] for c in self.codes[field]]
+
+    def revenue(self):
+        """
+        Returns the per-row Quantity * UnitPrice column
+        """
+        return array("d", (q * p for q, p in zip(self.quantity, self.unit_price)))
+
+
+# =========================
+#    GROUP-BY AGGREGATION
+# =========================
+
+
+def _group_sum(codes, values, size, zero=0.0):
+    """
+    Sums values per code, tracking first-appearance order of codes
+    """
+    sums = [zero] * size
+    counts = [0] * size
+    order = []
+
+    for code, value in zip(codes, values):
+        if not counts[code]:
+            order.append(code)
+        sums[code] += value
+        counts[code] += 1
+
+    return sums, counts, order
+
+
+def _group_sets(outer_codes, inner_codes, inner_labels, size):
+    """
+    Collects the distinct inner labels seen for each outer code
+    Rows are deduplicated as (outer, inner) code pairs first, so the
+    Python loop runs once per distinct pair rather than once per row
+    """
+    groups = [None] * size
+    for outer, inner in set(zip(outer_codes, inner_codes)):
+        if groups[outer] is None:
+            groups[outer] = set()
+        groups[outer].add(inner_labels[inner])
+
+    return groups
+
+
+def aggregate_table(table):
+    """
+    Builds the same aggregates as build_sales_aggregates
+    using group-bys over the integer code columns
+    """
+    labels = table.labels
+    codes = table.codes
+    quantity = table.quantity
+    revenue = table.revenue()
+
+    total_revenue = 0.0
+    for value in revenue:
+        total_revenue += value
+
+    # Region rollup
+    region_labels = labels["Region"]
+    sums, counts, order = _group_sum(codes["Region"], revenue, len(region_labels))
+    region_data = {
+        region_labels[c]: {"total_sales": sums[c], "transaction_count": counts[c]}
+        for c in order
+    }
+
+    # Product rollup
+    product_labels = labels["ProductName"]
+    product_codes = codes["ProductName"]
+    sums, _, order = _group_sum(product_codes, revenue, len(product_labels))
+    quantities, _, _ = _group_sum(product_codes, quantity, len(product_labels), zero=0)
+    product_data = {
+        product_labels[c]: {"quantity": quantities[c], "revenue": sums[c]}
+        for c in order
+    }
+
+    # Customer rollup
+    customer_labels = labels["CustomerID"]
+    customer_codes = codes["CustomerID"]
+    sums, counts, order = _group_sum(customer_codes, revenue, len(customer_labels))
+    bought = _group_sets(customer_codes, product_codes, product_labels, len(customer_labels))
+    customer_data = {
+        customer_labels[c]: {
+            "total_spent": sums[c],
+            "purchase_count": counts[c],
+            "products_bought": bought[c]
+        }
+        for c in order
+    }
+
+    # Daily rollup
+    date_labels = labels["Date"]
+    date_codes = codes["Date"]
+    sums, counts, order = _group_sum(date_codes, revenue, len(date_labels))
+    customers = _group_sets(date_codes, customer_codes, customer_labels, len(date_labels))
+    daily_data = {
+        date_labels[c]: {
+            "revenue": sums[c],
+            "transaction_count": counts[c],
+            "customers": customers[c]
+        }
+        for c in order
+    }
+
+    return {
+        "total_revenue": total_revenue,
+        "transaction_count": len(table),
+        "regions": region_data,
+        "products": product_data,
+        "customers": customer_data,
+        "daily": daily_data
+    }